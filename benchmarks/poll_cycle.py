@@ -0,0 +1,403 @@
+"""Benchmark poll and write cycles against a simulated fan.
+Runs the integration's coordinator, `FetchAndUpdate.update_all` and the
+number entity write path against `SimulatedFan`, so the cost of a cycle
+can be compared between changes on a machine without bluetooth. Run from
+the repository root with Home Assistant and the integration requirements
+installed:
+
+    python -m benchmarks.poll_cycle --cycles 20 --op-latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from types import MappingProxyType
+from typing import Any
+
+from homeassistant.components.number import NumberEntityDescription
+from homeassistant.config_entries import SOURCE_USER, ConfigEntries, ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from pyfreshintellivent import FreshIntelliVent
+
+from benchmarks.simulated_fan import (
+    FanCounters,
+    SimulatedConnection,
+    SimulatedFan,
+    SimulatedFanConfig,
+)
+from custom_components.fresh_intellivent_sky.const import (
+    CONF_AUTH_KEY,
+    CONF_IDLE_TIMEOUT,
+    CONF_KEEP_CONNECTED,
+    CONF_MODE_SCAN_INTERVAL,
+    CONF_WRITE_DELAY,
+    DEFAULT_IDLE_TIMEOUT,
+    DOMAIN,
+)
+from custom_components.fresh_intellivent_sky.coordinator import (
+    FreshIntelliventSkyCoordinator,
+)
+from custom_components.fresh_intellivent_sky.fetch_and_update import (
+    MAX_CONCURRENT_READS,
+    FetchAndUpdate,
+)
+from custom_components.fresh_intellivent_sky.number import FreshIntelliventSkyNumber
+from custom_components.fresh_intellivent_sky.state import DeviceState
+from custom_components.fresh_intellivent_sky.writes import PendingWrites
+
+ADDRESS = "AA:BB:CC:DD:EE:FF"
+AUTH_KEY = "0a1b2c3d"
+
+
+class SimulatedCoordinator(FreshIntelliventSkyCoordinator):
+    """The real coordinator, connected to a simulated fan."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        fan: SimulatedFan,
+        max_concurrent_reads: int,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(hass, entry)
+        self._max_concurrent_reads = max_concurrent_reads
+        self.connection = SimulatedConnection(
+            hass,
+            fan,
+            keep_connected=self._keep_connected,
+            idle_timeout=entry.options.get(CONF_IDLE_TIMEOUT, DEFAULT_IDLE_TIMEOUT),
+            on_disconnect=self._async_release_slot,
+        )
+
+    def _last_service_info(self) -> None:
+        return None
+
+    def _async_get_updates(self, client: FreshIntelliVent) -> FetchAndUpdate:
+        created = self._updates is None
+        updates = super()._async_get_updates(client)
+        if created:
+            updates.max_concurrent_reads = self._max_concurrent_reads
+        return updates
+
+
+@dataclass
+class ScenarioResult:
+    """Measurements from running one scenario."""
+
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    loop_times: list[float] = field(default_factory=list)
+    counters: list[FanCounters] = field(default_factory=list)
+    failed: int = 0
+    # Cycles that fell back to reading modes one at a time
+    fallbacks: int = 0
+
+    def summary(self) -> dict[str, Any]:
+        """Return the measurements summarized."""
+        cycles = len(self.latencies)
+        return {
+            "scenario": self.name,
+            "cycles": cycles,
+            "failed": self.failed,
+            "fallbacks": self.fallbacks,
+            **{
+                f"{name}_ms": round(value * 1000, 1)
+                for name, value in _percentiles(self.latencies).items()
+            },
+            "loop_ms_per_cycle": round(statistics.fmean(self.loop_times) * 1000, 2),
+            **{
+                f"{name}_per_cycle": round(
+                    statistics.fmean(
+                        getattr(counters, name) for counters in self.counters
+                    ),
+                    2,
+                )
+                for name in ("ops", "reads", "writes", "connects", "bytes_read")
+            },
+        }
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    if len(samples) < 2:
+        return {
+            "p50": samples[0],
+            "p90": samples[0],
+            "p99": samples[0],
+            "max": samples[0],
+        }
+    quantiles = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50": quantiles[49],
+        "p90": quantiles[89],
+        "p99": quantiles[98],
+        "max": max(samples),
+    }
+
+
+def _counters_since(fan: SimulatedFan, start: FanCounters) -> FanCounters:
+    return FanCounters(
+        **{
+            name: value - getattr(start, name)
+            for name, value in asdict(fan.counters).items()
+        }
+    )
+
+
+async def _async_measure(
+    result: ScenarioResult,
+    fan: SimulatedFan,
+    cycle: Callable[[], Awaitable[bool]],
+) -> None:
+    """Run one cycle and record what it cost.
+
+    Loop time is the CPU time used by the process during the cycle, which
+    leaves out the simulated latency the loop spends waiting.
+    """
+    counters = FanCounters(**asdict(fan.counters))
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+
+    if not await cycle():
+        result.failed += 1
+
+    result.latencies.append(time.perf_counter() - started)
+    result.loop_times.append(time.process_time() - cpu_started)
+    result.counters.append(_counters_since(fan, counters))
+
+
+async def async_benchmark_refresh(
+    coordinator: SimulatedCoordinator, fan: SimulatedFan, cycles: int
+) -> ScenarioResult:
+    """Time full coordinator refreshes."""
+    result = ScenarioResult("refresh")
+
+    async def _cycle() -> bool:
+        await coordinator.async_refresh()
+        return coordinator.last_update_success
+
+    for _ in range(cycles):
+        await _async_measure(result, fan, _cycle)
+    return result
+
+
+async def async_benchmark_update_all(
+    coordinator: SimulatedCoordinator,
+    fan: SimulatedFan,
+    cycles: int,
+    auth_key: str | None,
+    max_concurrent_reads: int,
+) -> ScenarioResult:
+    """Time `update_all` with every mode read, on an open session."""
+    result = ScenarioResult("update_all")
+    fallbacks = 0
+
+    for _ in range(cycles):
+        try:
+            async with coordinator.connection.async_session() as client:
+                if auth_key is not None:
+                    await client.authenticate(authentication_code=auth_key)
+                updates = FetchAndUpdate(
+                    client=client,
+                    pending=PendingWrites(),
+                    state=DeviceState(),
+                    max_concurrent_reads=max_concurrent_reads,
+                )
+
+                async def _cycle() -> bool:
+                    try:
+                        await updates.update_all()
+                    except Exception:  # pylint: disable=broad-except
+                        return False
+                    return True
+
+                await _async_measure(result, fan, _cycle)
+                if updates.max_concurrent_reads < max_concurrent_reads:
+                    fallbacks += 1
+        except Exception:  # pylint: disable=broad-except
+            # Failed to connect or authenticate, nothing was measured
+            result.failed += 1
+    result.fallbacks = fallbacks
+    return result
+
+
+async def async_benchmark_writes(
+    coordinator: SimulatedCoordinator, fan: SimulatedFan, cycles: int
+) -> ScenarioResult:
+    """Time entity writes, from setting values until they are written."""
+    result = ScenarioResult("write")
+
+    airing_rpm, airing_minutes, constant_speed_rpm = (
+        FreshIntelliventSkyNumber(
+            coordinator,
+            coordinator.data,
+            NumberEntityDescription(key=key, name=key),
+            keys=keys,
+        )
+        for key, keys in (
+            ("airing_rpm", ["airing", "rpm"]),
+            ("airing_minutes", ["airing", "minutes"]),
+            ("constant_speed_rpm", ["constant_speed", "rpm"]),
+        )
+    )
+
+    for cycle in range(cycles):
+
+        async def _cycle() -> bool:
+            rpm = 1000 + 10 * cycle
+            # The two airing writes are merged into one
+            await airing_rpm.async_set_native_value(rpm)
+            await airing_minutes.async_set_native_value(30 + cycle % 30)
+            await constant_speed_rpm.async_set_native_value(rpm)
+            await coordinator.writes.async_flush()
+            return len(coordinator.pending) == 0
+
+        await _async_measure(result, fan, _cycle)
+    return result
+
+
+def _create_entry(args: argparse.Namespace) -> ConfigEntry:
+    return ConfigEntry(
+        data={} if args.read_only else {CONF_AUTH_KEY: AUTH_KEY},
+        discovery_keys=MappingProxyType({}),
+        domain=DOMAIN,
+        minor_version=1,
+        options={
+            CONF_KEEP_CONNECTED: args.keep_connected,
+            CONF_MODE_SCAN_INTERVAL: args.mode_scan_interval,
+            CONF_WRITE_DELAY: 0,
+        },
+        source=SOURCE_USER,
+        subentries_data=None,
+        title="Simulated fan",
+        unique_id=ADDRESS,
+        version=1,
+    )
+
+
+async def async_run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Run all scenarios and return their summaries."""
+    fan = SimulatedFan(
+        ADDRESS,
+        SimulatedFanConfig(
+            op_latency=args.op_latency,
+            air_time=args.air_time,
+            reject_concurrent=args.reject_concurrent,
+            connect_time=args.connect_time,
+            failure_rate=args.failure_rate,
+            connect_failure_rate=args.connect_failure_rate,
+        ),
+        seed=args.seed,
+    )
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.config_entries = ConfigEntries(hass, {})
+        await dr.async_load(hass)
+
+        coordinator = SimulatedCoordinator(
+            hass, _create_entry(args), fan, args.max_concurrent_reads
+        )
+        await coordinator.device_info.async_load()
+
+        auth_key = None if args.read_only else AUTH_KEY
+        results = [
+            await async_benchmark_refresh(coordinator, fan, args.cycles),
+            await async_benchmark_update_all(
+                coordinator, fan, args.cycles, auth_key, args.max_concurrent_reads
+            ),
+        ]
+        if not args.read_only and coordinator.data is not None:
+            results.append(await async_benchmark_writes(coordinator, fan, args.cycles))
+
+        await coordinator.connection.async_disconnect()
+        coordinator.writes.async_shutdown()
+        await hass.async_block_till_done()
+        await hass.async_stop(force=True)
+
+    return [result.summary() for result in results if result.latencies]
+
+
+def _print_table(summaries: list[dict[str, Any]]) -> None:
+    columns = list(summaries[0])
+    widths = [
+        max(len(column), *(len(str(summary[column])) for summary in summaries))
+        for column in columns
+    ]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for summary in summaries:
+        print(
+            "  ".join(
+                str(summary[column]).ljust(width)
+                for column, width in zip(columns, widths)
+            )
+        )
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument(
+        "--op-latency", type=float, default=0.05, help="seconds per GATT operation"
+    )
+    parser.add_argument(
+        "--air-time",
+        type=float,
+        default=0.0,
+        help="seconds per GATT operation on air, one at a time",
+    )
+    parser.add_argument(
+        "--reject-concurrent",
+        action="store_true",
+        help="fail GATT operations started while another is in flight",
+    )
+    parser.add_argument(
+        "--max-concurrent-reads",
+        type=int,
+        default=MAX_CONCURRENT_READS,
+        help="mode reads in flight at once, 1 reads them one at a time",
+    )
+    parser.add_argument(
+        "--connect-time", type=float, default=1.0, help="seconds to connect"
+    )
+    parser.add_argument(
+        "--failure-rate", type=float, default=0.0, help="chance of a GATT op failing"
+    )
+    parser.add_argument(
+        "--connect-failure-rate",
+        type=float,
+        default=0.0,
+        help="chance of a connection attempt failing",
+    )
+    parser.add_argument("--keep-connected", action="store_true")
+    parser.add_argument(
+        "--mode-scan-interval",
+        type=float,
+        default=0,
+        help="seconds between mode reads during refreshes, 0 reads them every time",
+    )
+    parser.add_argument(
+        "--read-only", action="store_true", help="run without an auth key"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    summaries = asyncio.run(async_run(args))
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+    else:
+        _print_table(summaries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""A simulated Fresh Intellivent Sky fan for running without bluetooth."""
+from __future__ import annotations
+
+import asyncio
+import random
+from collections.abc import Callable
+from dataclasses import dataclass
+from struct import pack
+from types import SimpleNamespace
+from uuid import UUID
+
+from bleak import BleakClient
+from bleak.backends.device import BLEDevice
+from bleak.exc import BleakError
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from pyfreshintellivent import characteristics
+
+from custom_components.fresh_intellivent_sky.connection import (
+    FreshIntelliventConnection,
+)
+
+# Offset of the authenticated flag in the status characteristic
+STATUS_AUTHENTICATED_OFFSET = 7
+
+DEVICE_INFO_CHARACTERISTICS = {
+    characteristics.DEVICE_NAME: b"Intellivent SKY\0",
+    characteristics.FIRMWARE_VERSION: b"1.1.0",
+    characteristics.HARDWARE_VERSION: b"1.0",
+    characteristics.SOFTWARE_VERSION: b"1.1.0",
+    characteristics.MANUFACTURER_NAME: b"Fresh",
+}
+
+
+def _initial_values() -> dict[UUID, bytearray]:
+    """Return what a freshly installed fan reports."""
+    values = {
+        # Constant speed at 1200 rpm, 45 % humidity, 21.5 degrees
+        characteristics.DEVICE_STATUS: pack(
+            "<2B2H2B2H3B", 1, 16, 900, 2150, 0, 0, 1200, 2100, 0, 0, 0
+        ),
+        characteristics.AUTH: bytes.fromhex("0a1b2c3d"),
+        characteristics.HUMIDITY: pack("<?BH", True, 1, 1200),
+        characteristics.LIGHT_VOC: pack("<?B?B", True, 1, True, 1),
+        characteristics.CONSTANT_SPEED: pack("<?H", True, 1200),
+        characteristics.TIMER: pack("<B?BH", 10, False, 0, 1400),
+        characteristics.AIRING: pack("<?2BH", True, 26, 30, 1200),
+        characteristics.PAUSE: pack("<?B", False, 0),
+        characteristics.BOOST: pack("<?2H", False, 2000, 900),
+        characteristics.TEMPORARY_SPEED: pack("<?H", False, 1200),
+        **DEVICE_INFO_CHARACTERISTICS,
+    }
+    return {uuid: bytearray(value) for uuid, value in values.items()}
+
+
+@dataclass
+class SimulatedFanConfig:
+    """Timing and failure behaviour of a simulated fan."""
+
+    # Seconds per GATT read or write spent outside the radio, such as the
+    # round trip to a proxy, which overlaps between operations in flight
+    op_latency: float = 0.05
+    # Seconds per GATT read or write on air, one operation at a time as
+    # ATT allows a single outstanding request
+    air_time: float = 0.0
+    # Fail operations started while another one is in flight, like stacks
+    # that don't queue requests
+    reject_concurrent: bool = False
+    # Seconds to establish a connection
+    connect_time: float = 1.0
+    # Chance of a GATT operation failing
+    failure_rate: float = 0.0
+    # Chance of a connection attempt failing
+    connect_failure_rate: float = 0.0
+
+
+@dataclass
+class FanCounters:
+    """What the fan has been asked to do."""
+
+    connects: int = 0
+    reads: int = 0
+    writes: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    failures: int = 0
+
+    @property
+    def ops(self) -> int:
+        """Return the number of GATT operations."""
+        return self.reads + self.writes
+
+
+class SimulatedCharacteristic:
+    """Just enough of a bleak characteristic."""
+
+    def __init__(self, uuid: UUID, properties: list[str]) -> None:
+        """Initialize the characteristic."""
+        self.uuid = str(uuid)
+        self.properties = properties
+
+
+class SimulatedServices:
+    """Just enough of a bleak service collection."""
+
+    def __init__(self, uuids: list[UUID]) -> None:
+        """Initialize the services."""
+        self.characteristics = {
+            handle: SimulatedCharacteristic(
+                uuid,
+                (
+                    ["read", "notify"]
+                    if uuid == characteristics.DEVICE_STATUS
+                    else ["read", "write"]
+                ),
+            )
+            for handle, uuid in enumerate(uuids)
+        }
+
+    def get_characteristic(self, uuid: UUID) -> SimulatedCharacteristic | None:
+        """Return the characteristic with a UUID."""
+        for characteristic in self.characteristics.values():
+            if characteristic.uuid == str(uuid):
+                return characteristic
+        return None
+
+
+class SimulatedFan:
+    """The fan itself, which outlives the connections to it."""
+
+    def __init__(
+        self, address: str, config: SimulatedFanConfig, seed: int | None = None
+    ) -> None:
+        """Initialize the fan."""
+        self.address = address
+        self.config = config
+        self.counters = FanCounters()
+        self.values = _initial_values()
+        self.services = SimulatedServices(list(self.values))
+        self.ble_device: BLEDevice = SimpleNamespace(
+            address=address, name="Intellivent SKY"
+        )
+        self._random = random.Random(seed)
+        self._air = asyncio.Lock()
+        self._in_flight = 0
+
+    def _maybe_fail(self, rate: float, what: str) -> None:
+        if rate and self._random.random() < rate:
+            self.counters.failures += 1
+            raise BleakError(f"Simulated {what} failure")
+
+    async def _async_operation(self, what: str) -> None:
+        if self._in_flight and self.config.reject_concurrent:
+            self.counters.failures += 1
+            raise BleakError(f"Simulated {what} rejected, operation in progress")
+
+        self._in_flight += 1
+        try:
+            await asyncio.sleep(self.config.op_latency)
+            async with self._air:
+                await asyncio.sleep(self.config.air_time)
+        finally:
+            self._in_flight -= 1
+        self._maybe_fail(self.config.failure_rate, what)
+
+    async def async_connect(
+        self, disconnected_callback: Callable[[BleakClient], None]
+    ) -> SimulatedBleakClient:
+        """Open a connection to the fan."""
+        await asyncio.sleep(self.config.connect_time)
+        self.counters.connects += 1
+        self._maybe_fail(self.config.connect_failure_rate, "connect")
+
+        # A new connection starts out unauthenticated
+        self.values[characteristics.DEVICE_STATUS][STATUS_AUTHENTICATED_OFFSET] = 0
+        return SimulatedBleakClient(self, disconnected_callback)
+
+    async def async_read(self, uuid: UUID) -> bytearray:
+        """Read a characteristic."""
+        await self._async_operation("read")
+
+        value = self.values[uuid]
+        self.counters.reads += 1
+        self.counters.bytes_read += len(value)
+        return bytearray(value)
+
+    async def async_write(self, uuid: UUID, data: bytes | bytearray) -> None:
+        """Write a characteristic."""
+        await self._async_operation("write")
+
+        self.counters.writes += 1
+        self.counters.bytes_written += len(data)
+        if uuid == characteristics.AUTH:
+            authenticated = bytes(data) == bytes(self.values[characteristics.AUTH])
+            self.values[characteristics.DEVICE_STATUS][STATUS_AUTHENTICATED_OFFSET] = (
+                int(authenticated)
+            )
+        else:
+            self.values[uuid] = bytearray(data)
+
+
+class SimulatedBleakClient:
+    """Just enough of a bleak client, connected to a simulated fan."""
+
+    def __init__(
+        self,
+        fan: SimulatedFan,
+        disconnected_callback: Callable[[BleakClient], None],
+    ) -> None:
+        """Initialize the client."""
+        self._fan = fan
+        self._disconnected_callback = disconnected_callback
+        self.is_connected = True
+        self.services = fan.services
+        self.gatt_ops = 0
+        self.gatt_bytes = 0
+
+    async def read_gatt_char(self, char_specifier: UUID, **kwargs) -> bytearray:
+        """Read a characteristic."""
+        self.gatt_ops += 1
+        value = await self._fan.async_read(UUID(str(char_specifier)))
+        self.gatt_bytes += len(value)
+        return value
+
+    async def write_gatt_char(
+        self, char_specifier: UUID, data: bytes | bytearray, response: bool = False
+    ) -> None:
+        """Write a characteristic."""
+        self.gatt_ops += 1
+        self.gatt_bytes += len(data)
+        await self._fan.async_write(UUID(str(char_specifier)), data)
+
+    async def start_notify(self, char_specifier, callback, **kwargs) -> None:
+        """Notifications are accepted but never sent."""
+
+    async def disconnect(self) -> bool:
+        """Close the connection."""
+        if self.is_connected:
+            self.is_connected = False
+            self._disconnected_callback(self)
+        return True
+
+
+class SimulatedConnection(FreshIntelliventConnection):
+    """A connection that goes to a simulated fan instead of over bluetooth."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        fan: SimulatedFan,
+        keep_connected: bool,
+        idle_timeout: float,
+        on_disconnect: CALLBACK_TYPE | None = None,
+    ) -> None:
+        """Initialize the connection."""
+        super().__init__(hass, fan.address, keep_connected, idle_timeout, on_disconnect)
+        self._fan = fan
+
+    def _async_ble_device(self) -> BLEDevice:
+        return self._fan.ble_device
+
+    async def _async_establish_connection(self, ble_device: BLEDevice) -> BleakClient:
+        return await self._fan.async_connect(self._on_disconnect)
@@ -2,41 +2,24 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
 
+import voluptuous as vol
 from homeassistant.components import bluetooth
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_SCAN_INTERVAL, Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from pyfreshintellivent import FreshIntelliVent
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
 
 from .const import (
-    AIRING_MODE_UPDATE,
+    ATTR_CONFIG_ENTRY_ID,
     CONF_AUTH_KEY,
-    CONSTANT_SPEED_UPDATE,
-    DEFAULT_SCAN_INTERVAL,
     DOMAIN,
-    HUMIDITY_MODE_UPDATE,
-    LIGHT_AND_VOC_MODE_UPDATE,
-    TIMEOUT,
-    TIMER_MODE_UPDATE,
+    SERVICE_REFRESH_DEVICE_INFORMATION,
 )
-from .fetch_and_update import FetchAndUpdate
-
-
-class UnableToConnect(HomeAssistantError):
-    """Exception to indicate that we can not connect to device."""
-
-
-ALL_UPDATES = [
-    CONSTANT_SPEED_UPDATE,
-    AIRING_MODE_UPDATE,
-    HUMIDITY_MODE_UPDATE,
-    LIGHT_AND_VOC_MODE_UPDATE,
-    TIMER_MODE_UPDATE,
-]
+from .coordinator import FreshIntelliventSkyCoordinator
+from .device_info import async_remove_device_store
+from .last_state import async_remove_last_state_store
 
 AUTHENTICATED_PLATFORMS = [
     Platform.NUMBER,
@@ -49,6 +32,10 @@ READ_ONLY_PLATFORMS = [
     Platform.SENSOR,
 ]
 
+REFRESH_DEVICE_INFORMATION_SCHEMA = vol.Schema(
+    {vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string}
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -57,97 +44,86 @@ async def async_setup_entry(
 ) -> bool:  # pyling: disable=too-many-statements
     """Set up Fresh Intellivent Sky."""
     hass.data.setdefault(DOMAIN, {})
-    entry_data = hass.data[DOMAIN].setdefault(entry.entry_id, {})
     address = entry.unique_id
 
     assert address is not None
 
-    # Make sure we remove all old data
-    for update in ALL_UPDATES:
-        hass.data[update] = None
-
-    ble_device = bluetooth.async_ble_device_from_address(hass, address)
-
-    if not ble_device:
-        raise ConfigEntryNotReady(
-            f"Could not find Fresh Intellivent Sky device with address {address}"
-        )
-
     auth_key = entry.data.get(CONF_AUTH_KEY)
 
-    if not ble_device:
-        raise ConfigEntryNotReady(
-            f"Could not find Fresh Intellivent Sky device with address {address}"
-        )
-
-    async def _async_update_method():
-        """Get data from Fresh Intellivent Sky."""
-        ble_device = bluetooth.async_ble_device_from_address(hass, address)
-
-        if not ble_device:
-            raise UpdateFailed(f"Unable to find device: {address}")
-
-        client = FreshIntelliVent(ble_device=ble_device)
-
-        error = None
-
-        try:
-            await client.connect(timeout=TIMEOUT)
-            if auth_key is not None:
-                await client.authenticate(authentication_code=auth_key)
-            await client.fetch_sensor_data()
-            await client.fetch_device_information()
-
-            updates = FetchAndUpdate(hass=hass, client=client)
-            await updates.update_all()
-
-        except Exception as err:  # pylint: disable=broad-except
-            error = UpdateFailed(f"Unable to fetch data: {err}")
-
-        try:
-            await client.disconnect()
-        except Exception as err:  # pylint: disable=broad-except
-            _LOGGER.error(
-                "Couldn't disconnect",
-                address,
-                err,
-            )
-
-        if error is not None:
-            raise error
-
-        return client
-
-    entry_data[CONF_SCAN_INTERVAL] = entry.options.get(
-        CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
-    )
-
+    coordinator = FreshIntelliventSkyCoordinator(hass, entry)
+    entry.async_on_unload(coordinator.connection.async_disconnect)
+    entry.async_on_unload(coordinator.writes.async_shutdown)
+    entry.async_on_unload(coordinator.async_start_passive_updates())
+    entry.async_on_unload(coordinator.scheduler.async_register(entry.entry_id))
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name=DOMAIN,
-        update_method=_async_update_method,
-        update_interval=timedelta(
-            seconds=entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
-        ),
-    )
-
-    await coordinator.async_config_entry_first_refresh()
-
+    # Stored before the first refresh, as moving cached data out of the
+    # entry calls the update listener, which looks the coordinator up
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    try:
+        await coordinator.device_info.async_load()
+        restored = await coordinator.async_restore()
+        if not restored:
+            # Nothing saved to create the entities from, wait for the fan
+            if not bluetooth.async_ble_device_from_address(hass, address):
+                raise ConfigEntryNotReady(
+                    "Could not find Fresh Intellivent Sky device with address "
+                    f"{address}"
+                )
+            await coordinator.async_config_entry_first_refresh()
+    except BaseException:
+        # Don't leave a coordinator behind for the services to use
+        hass.data[DOMAIN].pop(entry.entry_id)
+        raise
 
     await hass.config_entries.async_forward_entry_setups(
         entry,
         READ_ONLY_PLATFORMS if auth_key is None else AUTHENTICATED_PLATFORMS
     )
 
+    if restored:
+        # Entities show the values saved before the restart until the fan
+        # has been reached, which doesn't hold up startup
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {address}"
+        )
+
+    _async_register_services(hass)
+
     return True
 
 
+def _async_register_services(hass: HomeAssistant) -> None:
+    """Register the integration services once."""
+    if hass.services.has_service(DOMAIN, SERVICE_REFRESH_DEVICE_INFORMATION):
+        return
+
+    async def _async_refresh_device_information(call: ServiceCall) -> None:
+        """Fetch device information again on the next update."""
+        entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+        for coordinator_entry_id, coordinator in hass.data[DOMAIN].items():
+            if entry_id is not None and coordinator_entry_id != entry_id:
+                continue
+            coordinator.device_info.invalidate()
+            await coordinator.async_request_refresh()
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH_DEVICE_INFORMATION,
+        _async_refresh_device_information,
+        schema=REFRESH_DEVICE_INFORMATION_SCHEMA,
+    )
+
+
 async def update_listener(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
     """Update when config_entry options update."""
+    coordinator: FreshIntelliventSkyCoordinator = hass.data[DOMAIN][
+        config_entry.entry_id
+    ]
+    if coordinator.options == config_entry.options:
+        # Only cached data in the entry changed, no need to reload
+        return
+
     _LOGGER.debug("Config entry was updated, rerunning setup")
     await hass.config_entries.async_reload(config_entry.entry_id)
 
@@ -160,3 +136,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove what was stored for a config entry."""
+    await async_remove_device_store(hass, entry.entry_id)
+    await async_remove_last_state_store(hass, entry.entry_id)
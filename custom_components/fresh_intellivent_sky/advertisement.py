@@ -0,0 +1,73 @@
+"""Sensor values from Fresh Intellivent Sky advertisements."""
+from __future__ import annotations
+
+from struct import error as StructError
+
+from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
+from pyfreshintellivent.sensors import SkySensors
+
+# Same length as the status characteristic read by `fetch_sensor_data`
+STATUS_LENGTH = 15
+
+# Values that can be taken from an advertisement. `authenticated` is left
+# out since it describes a connection, not the fan.
+PASSIVE_SENSOR_ATTRIBUTES = [
+    "status",
+    "mode",
+    "mode_raw",
+    "humidity",
+    "temperature",
+    "temperature_avg",
+    "rpm",
+]
+
+# An advertisement this recent is compared with the sensors read over GATT
+# (seconds)
+MATCH_WINDOW = 60
+
+# Readings can drift this much between an advertisement and the GATT read
+MATCH_TEMPERATURE_DELTA = 1.0
+MATCH_HUMIDITY_DELTA = 5.0
+
+
+def parse_advertisement(service_info: BluetoothServiceInfoBleak) -> SkySensors | None:
+    """Return the sensor values carried in an advertisement, if any.
+
+    Only manufacturer or service data shaped like the status characteristic
+    is used, anything else is ignored.
+    """
+    payloads = [
+        *service_info.manufacturer_data.values(),
+        *service_info.service_data.values(),
+    ]
+    for payload in payloads:
+        if len(payload) != STATUS_LENGTH:
+            continue
+
+        sensors = SkySensors()
+        try:
+            sensors.parse_data(payload)
+        except (StructError, ValueError):
+            continue
+        return sensors
+
+    return None
+
+
+def matches_read(advertised: SkySensors, read: SkySensors) -> bool:
+    """Return True if advertised values agree with ones read over GATT.
+
+    The advertisement layout isn't documented, so parsed advertisements
+    are only trusted once they have matched a read of the status
+    characteristic.
+    """
+    if advertised.status != read.status or advertised.mode_raw != read.mode_raw:
+        return False
+    if None in (advertised.temperature, read.temperature):
+        return False
+    if None in (advertised.humidity, read.humidity):
+        return False
+    return (
+        abs(advertised.temperature - read.temperature) <= MATCH_TEMPERATURE_DELTA
+        and abs(advertised.humidity - read.humidity) <= MATCH_HUMIDITY_DELTA
+    )
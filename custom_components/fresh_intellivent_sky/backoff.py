@@ -0,0 +1,77 @@
+"""Backoff after failed updates for Fresh Intellivent Sky."""
+from __future__ import annotations
+
+import random
+import time
+from datetime import timedelta
+
+# First delay after a failure, doubled for each failure in a row (seconds)
+INITIAL_BACKOFF = 30
+MAX_BACKOFF = 1800
+
+# Stop connecting after this many failures in a row
+CIRCUIT_BREAKER_FAILURES = 5
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+CIRCUIT_STATES = [CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_HALF_OPEN]
+
+
+class FailureBackoff:
+    """Back off after failed updates and stop trying unreachable fans.
+
+    Each failure in a row doubles the delay before the next attempt, with
+    jitter so fans failing together don't retry together. After
+    `CIRCUIT_BREAKER_FAILURES` failures the circuit opens and no
+    connections are made until the fan is seen advertising again, which
+    allows one more attempt once the current delay has passed.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the backoff."""
+        self.failures = 0
+        self.circuit = CIRCUIT_CLOSED
+        self.delay: timedelta | None = None
+        # When the delay after the last failure is over
+        self._retry_at: float | None = None
+
+    @property
+    def allows_connect(self) -> bool:
+        """Return True if a connection may be attempted."""
+        return self.circuit != CIRCUIT_OPEN
+
+    def success(self) -> None:
+        """Reset after a successful update."""
+        self.failures = 0
+        self.circuit = CIRCUIT_CLOSED
+        self.delay = None
+        self._retry_at = None
+
+    def failure(self) -> timedelta:
+        """Count a failed update and return the delay before the next one."""
+        self.failures += 1
+
+        backoff = min(MAX_BACKOFF, INITIAL_BACKOFF * 2 ** (self.failures - 1))
+        self.delay = timedelta(seconds=backoff * random.uniform(0.5, 1))
+        self._retry_at = time.monotonic() + self.delay.total_seconds()
+
+        if self.failures >= CIRCUIT_BREAKER_FAILURES:
+            self.circuit = CIRCUIT_OPEN
+
+        return self.delay
+
+    def device_seen(self) -> bool:
+        """Note an advertisement, return True if it allows another attempt.
+
+        A fan that keeps advertising but can't be connected to is only
+        tried once per delay, which keeps growing towards `MAX_BACKOFF`.
+        """
+        if self.circuit != CIRCUIT_OPEN:
+            return False
+        if self._retry_at is not None and time.monotonic() < self._retry_at:
+            return False
+
+        self.circuit = CIRCUIT_HALF_OPEN
+        return True
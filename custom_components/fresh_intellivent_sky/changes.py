@@ -0,0 +1,50 @@
+"""Tracking which device values changed between updates."""
+from __future__ import annotations
+
+from typing import Any
+
+from .snapshot import SENSOR_FIELDS, SensorSnapshot
+
+SENSORS_KEY = "sensors"
+MODES_KEY = "modes"
+DIAGNOSTICS_KEY = "diagnostics"
+
+
+def value_key(*path: str) -> str:
+    """Return the key of a value, such as `modes.humidity.rpm`."""
+    return ".".join(path)
+
+
+def _flatten(values: dict[str, Any], prefix: str, flat: dict[str, Any]) -> None:
+    for key, value in values.items():
+        if isinstance(value, dict):
+            _flatten(value, value_key(prefix, key), flat)
+        else:
+            flat[value_key(prefix, key)] = value
+
+
+def device_values(
+    sensors: SensorSnapshot | None, modes: dict[str, Any]
+) -> dict[str, Any]:
+    """Return the sensor and mode values of a device, keyed by `value_key`."""
+    flat: dict[str, Any] = {}
+    if sensors is not None:
+        for name in SENSOR_FIELDS:
+            flat[value_key(SENSORS_KEY, name)] = getattr(sensors, name)
+    _flatten(modes, MODES_KEY, flat)
+    return flat
+
+
+def changed_keys(old: dict[str, Any], new: dict[str, Any]) -> set[str]:
+    """Return the keys of changed values, and of everything above them.
+
+    A change to `modes.humidity.rpm` also returns `modes.humidity` and
+    `modes`, so listeners can watch a whole mode.
+    """
+    changed = set()
+    for key in old.keys() | new.keys():
+        if key in old and key in new and old[key] == new[key]:
+            continue
+        parts = key.split(".")
+        changed.update(value_key(*parts[:end]) for end in range(1, len(parts) + 1))
+    return changed
@@ -1,6 +1,7 @@
 """Config flow for Fresh Intellivent Sky integration."""
 from __future__ import annotations
 
+import asyncio
 import dataclasses
 import logging
 from typing import Any, cast
@@ -22,17 +23,42 @@ from voluptuous.validators import All, Range
 
 from .const import (
     CONF_AUTH_KEY,
+    CONF_HUMIDITY_DEADBAND,
+    CONF_IDLE_TIMEOUT,
+    CONF_KEEP_CONNECTED,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MAX_SILENCE,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_MODE_SCAN_INTERVALS,
+    CONF_RPM_DEADBAND,
     CONF_SCAN_INTERVAL,
+    CONF_TEMPERATURE_DEADBAND,
+    CONF_WRITE_DELAY,
+    DEFAULT_HUMIDITY_DEADBAND,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_KEEP_CONNECTED,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MAX_SILENCE,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_RPM_DEADBAND,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    DEFAULT_WRITE_DELAY,
     DOMAIN,
+    MODES,
     NAME,
     AUTH_MANUAL,
     AUTH_FETCH,
     NO_AUTH,
     AUTH_CODE_ONLY_ZERO,
     AUTH_CODE_EMPTY,
+    PROBE_TIMEOUT,
     TIMEOUT,
 )
+from .deadband import Deadband
+from .interval import mode_scan_interval
+from .probe_cache import async_get_probe_cache
+from .scheduler import PRIORITY_POLL, async_get_scheduler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,7 +69,8 @@ class Discovery:
 
     name: str
     discovery_info: BluetoothServiceInfo
-    device: FreshIntelliVent
+    # None until device information has been read from it
+    device: FreshIntelliVent | None
 
 
 def get_name(device: FreshIntelliVent) -> str:
@@ -51,6 +78,20 @@ def get_name(device: FreshIntelliVent) -> str:
     return f"{device.manufacturer} {device.name}"
 
 
+def get_advertised_name(discovery_info: BluetoothServiceInfo) -> str:
+    """Generate name with identifier from an advertisement, without connecting."""
+    return f"{discovery_info.name} {discovery_info.address[-5:].replace(':', '')}"
+
+
+def is_valid_deadband(value: str) -> bool:
+    """Return True if the value is an absolute or percent deadband."""
+    try:
+        Deadband.parse(value)
+    except ValueError:
+        return False
+    return True
+
+
 class FreshIntelliventSkyDeviceUpdateError(Exception):
     """Custom error class for device updates."""
 
@@ -64,6 +105,8 @@ class FreshIntelliventSkyConfigFlow(ConfigFlow, domain=DOMAIN):
         """Initialize the config flow."""
         self._discovered_device: Discovery | None = None
         self._discovered_devices: dict[str, Discovery] = {}
+        # Address to name of devices that couldn't be probed
+        self._failed_devices: dict[str, str] = {}
 
     async def _get_device_data(
         self, discovery_info: BluetoothServiceInfo
@@ -100,22 +143,47 @@ class FreshIntelliventSkyConfigFlow(ConfigFlow, domain=DOMAIN):
 
         return client
 
+    async def _async_probe(self, discovery_info: BluetoothServiceInfo) -> Discovery:
+        """Read device information, sharing connection slots with the fans.
+
+        The timeout only starts once a slot is free, so devices waiting
+        behind others on the same adapter aren't failed for it. A device
+        probed recently by any flow isn't connected to again.
+        """
+        probe_cache = async_get_probe_cache(self.hass)
+        if (device := probe_cache.async_get(discovery_info.address)) is not None:
+            return Discovery(get_name(device), discovery_info, device)
+
+        async with async_get_scheduler(self.hass).async_slot(
+            discovery_info.source, PRIORITY_POLL
+        ):
+            try:
+                async with asyncio.timeout(PROBE_TIMEOUT):
+                    device = await self._get_device_data(discovery_info)
+            except TimeoutError as err:
+                _LOGGER.error("Timed out getting data from %s", discovery_info.address)
+                raise FreshIntelliventSkyDeviceUpdateError("Timed out") from err
+
+        probe_cache.async_add(device)
+        return Discovery(get_name(device), discovery_info, device)
+
     async def async_step_bluetooth(
         self, discovery_info: BluetoothServiceInfo
     ) -> FlowResult:
-        """Handle the bluetooth discovery step."""
+        """Handle the bluetooth discovery step.
+
+        Nothing is read from the device here, it is named from the
+        advertisement unless a recent probe already read its information.
+        """
         _LOGGER.debug("Discovered BT device: %s", discovery_info)
         await self.async_set_unique_id(discovery_info.address)
         self._abort_if_unique_id_configured()
 
-        try:
-            device = await self._get_device_data(discovery_info)
-        except FreshIntelliventSkyDeviceUpdateError:
-            return self.async_abort(reason="cannot_connect")
-        except Exception:  # pylint: disable=broad-except
-            return self.async_abort(reason="unknown")
-
-        name = get_name(device)
+        device = async_get_probe_cache(self.hass).async_get(discovery_info.address)
+        if device is None:
+            name = get_advertised_name(discovery_info)
+        else:
+            name = get_name(device)
         self.context["title_placeholders"] = {"name": name}
         self._discovered_device = Discovery(name, discovery_info, device)
 
@@ -152,24 +220,37 @@ class FreshIntelliventSkyConfigFlow(ConfigFlow, domain=DOMAIN):
             return await self.async_step_auth_method()
 
         current_addresses = self._async_current_ids()
-        for discovery_info in async_discovered_service_info(self.hass):
-            address = discovery_info.address
-            if address in current_addresses or address in self._discovered_devices:
-                continue
-
-            if discovery_info.name not in NAME:
-                continue
-
-            try:
-                device = await self._get_device_data(discovery_info)
-            except FreshIntelliventSkyDeviceUpdateError:
-                return self.async_abort(reason="cannot_connect")
-            except Exception:  # pylint: disable=broad-except
-                return self.async_abort(reason="unknown")
-            name = get_name(device)
-            self._discovered_devices[address] = Discovery(name, discovery_info, device)
+        to_probe = [
+            discovery_info
+            for discovery_info in async_discovered_service_info(self.hass)
+            if discovery_info.address not in current_addresses
+            and discovery_info.address not in self._discovered_devices
+            and discovery_info.name in NAME
+        ]
+
+        # Probe all devices at once, the scheduler caps connections per adapter
+        self._failed_devices = {}
+        results = await asyncio.gather(
+            *(self._async_probe(discovery_info) for discovery_info in to_probe),
+            return_exceptions=True,
+        )
+        for discovery_info, result in zip(to_probe, results):
+            if isinstance(result, Exception):
+                self._failed_devices[discovery_info.address] = discovery_info.name
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                self._discovered_devices[discovery_info.address] = result
 
+        failed = ", ".join(
+            f"{name} ({address})" for address, name in self._failed_devices.items()
+        )
         if not self._discovered_devices:
+            if self._failed_devices:
+                return self.async_abort(
+                    reason="cannot_connect_any",
+                    description_placeholders={"failed": failed},
+                )
             return self.async_abort(reason="no_devices_found")
 
         titles = {
@@ -181,6 +262,9 @@ class FreshIntelliventSkyConfigFlow(ConfigFlow, domain=DOMAIN):
             data_schema=vol.Schema(
                 {vol.Required(CONF_ADDRESS): vol.In(titles)},
             ),
+            description_placeholders={
+                "failed": f"Couldn't connect to: {failed}" if failed else ""
+            },
         )
 
     async def async_step_auth_method(
@@ -239,15 +323,35 @@ class FreshIntelliventSkyConfigFlow(ConfigFlow, domain=DOMAIN):
         """Fetch auth key."""
         errors = {}
         code = None
+        discovery = self._discovered_device
+        device = discovery.device
+        if device is None and (
+            ble_device := bluetooth.async_ble_device_from_address(
+                self.hass, discovery.discovery_info.address
+            )
+        ):
+            device = FreshIntelliVent(ble_device=ble_device)
+
         try:
-            await self._discovered_device.device.connect(timeout=TIMEOUT)
-            code = await self._discovered_device.device.fetch_authentication_code()
+            if device is None:
+                raise FreshIntelliventSkyDeviceUpdateError("No ble_device")
+            await device.connect(timeout=TIMEOUT)
+            code = await device.fetch_authentication_code()
             code = validated_authentication_code(code)
+            if discovery.device is None:
+                # Discovered from an advertisement, read the information
+                # on this connection to name the entry after the device
+                await device.fetch_device_information()
+                async_get_probe_cache(self.hass).async_add(device)
+                discovery.device = device
+                discovery.name = get_name(device)
+                self.context["title_placeholders"] = {"name": discovery.name}
         except Exception as err:  # pylint: disable=broad-except
             _LOGGER.debug(err)
             errors["base"] = err
         finally:
-            await self._discovered_device.device.disconnect()
+            if device is not None:
+                await device.disconnect()
 
         if code is None:
             _LOGGER.error(
@@ -292,22 +396,106 @@ class FreshIntelliventSkyOptionsFlowHandler(OptionsFlow):  # type: ignore[misc]
         self, user_input: dict[str, Any] | None = None
     ) -> dict[str, Any]:
         """Manage the options."""
+        errors: dict[str, str] = {}
         if user_input is not None:
-            return cast(
-                dict[str, Any], self.async_create_entry(title="", data=user_input)
-            )
+            # Checked here, a validator in the schema can't be serialized
+            for key in (
+                CONF_TEMPERATURE_DEADBAND,
+                CONF_HUMIDITY_DEADBAND,
+                CONF_RPM_DEADBAND,
+            ):
+                if key in user_input and not is_valid_deadband(user_input[key]):
+                    errors[key] = "invalid_deadband"
+            if not errors:
+                return cast(
+                    dict[str, Any], self.async_create_entry(title="", data=user_input)
+                )
 
+        # Show what was entered again when some of it was invalid
+        options = {**self._config_entry.options, **(user_input or {})}
         schema: dict[Any, Any] = {
             vol.Optional(
                 CONF_SCAN_INTERVAL,
-                default=self._config_entry.options.get(
+                default=options.get(
                     CONF_SCAN_INTERVAL,
                     DEFAULT_SCAN_INTERVAL,
                 ),
             ): All(int, Range(min=5)),
+            vol.Optional(
+                CONF_MIN_SCAN_INTERVAL,
+                default=options.get(
+                    CONF_MIN_SCAN_INTERVAL,
+                    DEFAULT_MIN_SCAN_INTERVAL,
+                ),
+            ): All(int, Range(min=5)),
+            vol.Optional(
+                CONF_MAX_SCAN_INTERVAL,
+                default=options.get(
+                    CONF_MAX_SCAN_INTERVAL,
+                    DEFAULT_MAX_SCAN_INTERVAL,
+                ),
+            ): All(int, Range(min=5)),
+            **{
+                vol.Optional(
+                    CONF_MODE_SCAN_INTERVALS[mode],
+                    default=mode_scan_interval(options, mode),
+                ): All(int, Range(min=0))
+                for mode in MODES
+            },
+            vol.Optional(
+                CONF_KEEP_CONNECTED,
+                default=options.get(
+                    CONF_KEEP_CONNECTED,
+                    DEFAULT_KEEP_CONNECTED,
+                ),
+            ): bool,
+            vol.Optional(
+                CONF_IDLE_TIMEOUT,
+                default=options.get(
+                    CONF_IDLE_TIMEOUT,
+                    DEFAULT_IDLE_TIMEOUT,
+                ),
+            ): All(int, Range(min=0)),
+            vol.Optional(
+                CONF_WRITE_DELAY,
+                default=options.get(
+                    CONF_WRITE_DELAY,
+                    DEFAULT_WRITE_DELAY,
+                ),
+            ): All(int, Range(min=0)),
+            vol.Optional(
+                CONF_TEMPERATURE_DEADBAND,
+                default=options.get(
+                    CONF_TEMPERATURE_DEADBAND,
+                    DEFAULT_TEMPERATURE_DEADBAND,
+                ),
+            ): str,
+            vol.Optional(
+                CONF_HUMIDITY_DEADBAND,
+                default=options.get(
+                    CONF_HUMIDITY_DEADBAND,
+                    DEFAULT_HUMIDITY_DEADBAND,
+                ),
+            ): str,
+            vol.Optional(
+                CONF_RPM_DEADBAND,
+                default=options.get(
+                    CONF_RPM_DEADBAND,
+                    DEFAULT_RPM_DEADBAND,
+                ),
+            ): str,
+            vol.Optional(
+                CONF_MAX_SILENCE,
+                default=options.get(
+                    CONF_MAX_SILENCE,
+                    DEFAULT_MAX_SILENCE,
+                ),
+            ): All(int, Range(min=0)),
         }
 
         return cast(
             dict[str, Any],
-            self.async_show_form(step_id="init", data_schema=vol.Schema(schema)),
+            self.async_show_form(
+                step_id="init", data_schema=vol.Schema(schema), errors=errors
+            ),
         )
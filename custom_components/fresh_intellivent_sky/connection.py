@@ -0,0 +1,335 @@
+"""Connection handling for Fresh Intellivent Sky devices."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from datetime import datetime
+from uuid import UUID
+
+from bleak import BleakClient
+from bleak.backends.device import BLEDevice
+from bleak.exc import BleakCharacteristicNotFoundError, BleakError
+from bleak_retry_connector import BleakClientWithServiceCache, establish_connection
+from homeassistant.components import bluetooth
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from pyfreshintellivent import FreshIntelliVent
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UnableToConnect(HomeAssistantError):
+    """Exception to indicate that we can not connect to device."""
+
+
+class CountingBleakClient(BleakClientWithServiceCache):
+    """Bleak client that counts GATT reads and writes."""
+
+    gatt_ops = 0
+    gatt_bytes = 0
+
+    async def read_gatt_char(self, *args, **kwargs) -> bytearray:
+        """Read a characteristic."""
+        self.gatt_ops += 1
+        value = await super().read_gatt_char(*args, **kwargs)
+        self.gatt_bytes += len(value)
+        return value
+
+    async def write_gatt_char(self, char_specifier, data, *args, **kwargs) -> None:
+        """Write a characteristic."""
+        self.gatt_ops += 1
+        self.gatt_bytes += len(data)
+        await super().write_gatt_char(char_specifier, data, *args, **kwargs)
+
+
+class FreshIntelliventConnection:
+    """Own the client and BLE connection for one config entry.
+
+    When `keep_connected` is set the connection is kept open between polls
+    and writes, and only closed after `idle_timeout` seconds without use.
+    A dropped connection is noticed through the bleak disconnect callback
+    and re-established the next time the client is needed. `on_disconnect`
+    is called whenever the connection is closed or dropped.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        address: str,
+        keep_connected: bool,
+        idle_timeout: float,
+        on_disconnect: CALLBACK_TYPE | None = None,
+    ) -> None:
+        """Initialize the connection."""
+        self._hass = hass
+        self._address = address
+        self._keep_connected = keep_connected
+        self._idle_timeout = idle_timeout
+        self._on_disconnect_callback = on_disconnect
+
+        self._client: FreshIntelliVent | None = None
+        self._connect_lock = asyncio.Lock()
+        self._session_lock = asyncio.Lock()
+        self._cancel_idle_timer: CALLBACK_TYPE | None = None
+        self._expected_disconnect = False
+
+        # True if the last call to async_connect had to establish a connection
+        self.new_connection = False
+        # Notifications started on the current connection
+        self._notifying: dict[UUID, bool] = {}
+        # True once the current connection has been authenticated
+        self._authenticated = False
+
+    @property
+    def address(self) -> str:
+        """Return the address of the device."""
+        return self._address
+
+    @property
+    def client(self) -> FreshIntelliVent | None:
+        """Return the client, connected or not."""
+        return self._client
+
+    @property
+    def is_connected(self) -> bool:
+        """Return True if there is an open connection to the device."""
+        return (
+            self._client is not None
+            and self._client._client is not None
+            and self._client._client.is_connected
+        )
+
+    @property
+    def gatt_ops(self) -> int:
+        """Return the GATT operations done on the current connection."""
+        if self._client is None:
+            return 0
+        return getattr(self._client._client, "gatt_ops", 0)
+
+    @property
+    def gatt_bytes(self) -> int:
+        """Return the bytes read and written on the current connection."""
+        if self._client is None:
+            return 0
+        return getattr(self._client._client, "gatt_bytes", 0)
+
+    async def async_connect(self) -> FreshIntelliVent:
+        """Return a connected client, connecting only if needed."""
+        self._async_cancel_idle_timer()
+
+        async with self._connect_lock:
+            if self.is_connected:
+                self.new_connection = False
+                return self._client
+
+            ble_device = self._async_ble_device()
+            if self._client is None:
+                self._client = FreshIntelliVent(ble_device=ble_device)
+
+            # pyfreshintellivent doesn't let us pass a disconnect callback,
+            # so the bleak client is created here and handed over.
+            self._expected_disconnect = False
+            self._client._client = await self._async_establish_connection(ble_device)
+            self._client._connected = True
+            self.new_connection = True
+            self._notifying = {}
+            self._authenticated = False
+            _LOGGER.debug("Connected to %s", self._address)
+
+            return self._client
+
+    def _async_ble_device(self) -> BLEDevice:
+        """Return the device to connect to."""
+        ble_device = bluetooth.async_ble_device_from_address(
+            self._hass, self._address, connectable=True
+        )
+        if not ble_device:
+            raise UnableToConnect(f"Unable to find device: {self._address}")
+        return ble_device
+
+    async def _async_establish_connection(self, ble_device: BLEDevice) -> BleakClient:
+        """Open a bleak connection to the device."""
+        return await establish_connection(
+            CountingBleakClient,
+            ble_device,
+            self._address,
+            disconnected_callback=self._on_disconnect,
+            use_services_cache=True,
+            ble_device_callback=lambda: self._best_ble_device(ble_device),
+        )
+
+    @asynccontextmanager
+    async def async_session(self) -> AsyncIterator[FreshIntelliVent]:
+        """Connect, and release when done, one poll or write at a time."""
+        async with self._session_lock:
+            client = await self.async_connect()
+            failed = True
+            try:
+                yield client
+                failed = False
+            except Exception as err:
+                if _is_characteristic_missing(err):
+                    await self._async_clear_service_cache()
+                raise
+            finally:
+                # Don't keep a connection around that just failed us
+                await self.async_release(disconnect=failed)
+
+    async def async_authenticate(self, auth_key: str) -> bool:
+        """Authenticate the current connection once.
+
+        Authenticating again is only needed on a new connection, or if the
+        fan reported the connection as not authenticated. Returns False if
+        the connection was already authenticated.
+        """
+        if self._authenticated and self._client.sensors.authenticated is not False:
+            return False
+
+        await self._client.authenticate(authentication_code=auth_key)
+        self._authenticated = True
+        return True
+
+    async def async_start_notify(
+        self, uuid: UUID, handler: Callable[[object, bytearray], None]
+    ) -> bool:
+        """Subscribe to a characteristic once per connection.
+
+        Returns False if the device doesn't support notifications on it.
+        """
+        if uuid in self._notifying:
+            return self._notifying[uuid]
+
+        bleak_client = self._client._client
+        characteristic = bleak_client.services.get_characteristic(uuid)
+        if characteristic is None or "notify" not in characteristic.properties:
+            _LOGGER.debug("%s doesn't support notifications on %s", self._address, uuid)
+            self._notifying[uuid] = False
+            return False
+
+        try:
+            await bleak_client.start_notify(characteristic, handler)
+        except BleakError as err:
+            # Notifications only save polls, carry on without them
+            _LOGGER.debug(
+                "Couldn't subscribe to %s from %s: %s", uuid, self._address, err
+            )
+            self._notifying[uuid] = False
+            return False
+        self._notifying[uuid] = True
+        _LOGGER.debug("Subscribed to notifications on %s from %s", uuid, self._address)
+        return True
+
+    async def async_release(self, disconnect: bool = False) -> None:
+        """Release the client after a poll or write.
+
+        The connection is closed right away unless it should be kept open,
+        in which case the idle timer is (re)started.
+        """
+        if disconnect or not self._keep_connected:
+            await self.async_disconnect()
+            return
+
+        self._async_start_idle_timer()
+
+    @callback
+    def async_keep_alive(self) -> None:
+        """Restart the idle timer, as the connection is still in use."""
+        if self._cancel_idle_timer is not None:
+            self._async_start_idle_timer()
+
+    def _async_start_idle_timer(self) -> None:
+        self._async_cancel_idle_timer()
+        self._cancel_idle_timer = async_call_later(
+            self._hass, self._idle_timeout, self._async_idle_disconnect
+        )
+
+    async def async_disconnect(self) -> None:
+        """Close the connection to the device."""
+        self._async_cancel_idle_timer()
+
+        if self._client is None:
+            return
+
+        self._expected_disconnect = True
+        try:
+            await self._client.disconnect()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.error("Couldn't disconnect from %s: %s", self._address, err)
+        self._async_disconnected()
+
+    async def async_close_idle(self) -> None:
+        """Close the connection, unless a poll or write is using it."""
+        self._async_cancel_idle_timer()
+        if self._session_lock.locked():
+            # Releasing it afterwards decides whether it stays open
+            return
+
+        async with self._session_lock:
+            await self.async_disconnect()
+
+    async def _async_idle_disconnect(self, _now: datetime) -> None:
+        """Close the connection after being idle."""
+        self._cancel_idle_timer = None
+        if self._session_lock.locked():
+            # A poll or write picked the connection up as the timer fired,
+            # releasing it starts the timer again
+            return
+
+        _LOGGER.debug(
+            "Closing idle connection to %s after %s seconds",
+            self._address,
+            self._idle_timeout,
+        )
+        await self.async_close_idle()
+
+    @callback
+    def _async_disconnected(self) -> None:
+        if self._on_disconnect_callback is not None:
+            self._on_disconnect_callback()
+
+    def _best_ble_device(self, fallback: BLEDevice) -> BLEDevice:
+        """Return the device through the best adapter or proxy right now."""
+        return (
+            bluetooth.async_ble_device_from_address(
+                self._hass, self._address, connectable=True
+            )
+            or fallback
+        )
+
+    async def _async_clear_service_cache(self) -> None:
+        """Discover services again on the next connection."""
+        bleak_client = self._client._client if self._client else None
+        if isinstance(bleak_client, BleakClientWithServiceCache):
+            _LOGGER.debug("Clearing cached services for %s", self._address)
+            await bleak_client.clear_cache()
+
+    def _async_cancel_idle_timer(self) -> None:
+        if self._cancel_idle_timer is not None:
+            self._cancel_idle_timer()
+            self._cancel_idle_timer = None
+
+    def _on_disconnect(self, _client: BleakClient) -> None:
+        """Handle the bleak disconnect callback."""
+        if self._expected_disconnect:
+            return
+
+        _LOGGER.debug(
+            "Connection to %s dropped, reconnecting on next use", self._address
+        )
+        self._async_cancel_idle_timer()
+        self._async_disconnected()
+
+
+def _is_characteristic_missing(err: BaseException | None) -> bool:
+    """Return True if the error, or what caused it, is a missing characteristic.
+
+    pyfreshintellivent wraps bleak errors in its own exceptions.
+    """
+    while err is not None:
+        if isinstance(err, BleakCharacteristicNotFoundError):
+            return True
+        err = err.__cause__ or err.__context__
+    return False
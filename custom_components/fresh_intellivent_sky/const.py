@@ -7,7 +7,19 @@ NAME = ["Intellivent SKY", "Intellivent ICE"]
 DISPATCH_DETECTION = f"{DOMAIN}.detection"
 
 DEFAULT_SCAN_INTERVAL = 120
+DEFAULT_MIN_SCAN_INTERVAL = 30
+DEFAULT_MAX_SCAN_INTERVAL = 600
+DEFAULT_KEEP_CONNECTED = False
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_WRITE_DELAY = 1
+# Deadbands are absolute in the sensor's unit, or relative with a % suffix
+DEFAULT_TEMPERATURE_DEADBAND = "0.2"
+DEFAULT_HUMIDITY_DEADBAND = "1"
+DEFAULT_RPM_DEADBAND = "2%"
+DEFAULT_MAX_SILENCE = 900
 TIMEOUT = 30.0
+# Connecting to and reading device information from one fan during setup
+PROBE_TIMEOUT = 45.0
 
 AUTH_MANUAL = "auth_manual"
 AUTH_FETCH = "auth_fetch"
@@ -17,6 +29,23 @@ AUTH_CODE_EMPTY = "auth_code_empty"
 
 CONF_AUTH_KEY = "auth_key"
 CONF_SCAN_INTERVAL = "scan_interval"
+# One interval for all modes, used by entries set up before modes had their own
+CONF_MODE_SCAN_INTERVAL = "mode_scan_interval"
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_KEEP_CONNECTED = "keep_connected"
+CONF_IDLE_TIMEOUT = "idle_timeout"
+CONF_WRITE_DELAY = "write_delay"
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+CONF_HUMIDITY_DEADBAND = "humidity_deadband"
+CONF_RPM_DEADBAND = "rpm_deadband"
+CONF_MAX_SILENCE = "max_silence"
+CONF_DEVICE_INFO = "device_info"
+
+SERVICE_REFRESH_DEVICE_INFORMATION = "refresh_device_information"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+# Set on entities showing values restored from before a restart
+ATTR_STALE = "stale"
 
 DETECTION_OFF = "Off"
 
@@ -29,6 +58,19 @@ HUMIDITY_MODE_UPDATE = "humidity_mode_update"
 LIGHT_AND_VOC_MODE_UPDATE = "light_and_voc_mode_update"
 TIMER_MODE_UPDATE = "timer_mode_update"
 
+MODES = ["airing", "constant_speed", "humidity", "light_and_voc", "timer"]
+
+# Seconds between reads of each mode. Speeds and detection settings only
+# change when someone edits them, the timer is used from day to day.
+DEFAULT_MODE_SCAN_INTERVALS = {
+    "airing": 1800,
+    "constant_speed": 1800,
+    "humidity": 1800,
+    "light_and_voc": 1800,
+    "timer": 600,
+}
+CONF_MODE_SCAN_INTERVALS = {mode: f"{mode}_scan_interval" for mode in MODES}
+
 DETECTION_KEY = "detection"
 ENABLED_KEY = "enabled"
 DELAY_KEY = "delay"
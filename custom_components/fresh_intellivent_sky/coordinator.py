@@ -0,0 +1,574 @@
+"""Data update coordinator for the Fresh Intellivent Sky integration."""
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from homeassistant.components import bluetooth
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from pyfreshintellivent import FreshIntelliVent, characteristics
+from pyfreshintellivent.sensors import SkySensors
+
+from .advertisement import (
+    MATCH_WINDOW,
+    PASSIVE_SENSOR_ATTRIBUTES,
+    matches_read,
+    parse_advertisement,
+)
+from .backoff import FailureBackoff
+from .changes import DIAGNOSTICS_KEY, changed_keys, device_values, value_key
+from .connection import FreshIntelliventConnection, UnableToConnect
+from .const import (
+    CONF_AUTH_KEY,
+    CONF_HUMIDITY_DEADBAND,
+    CONF_IDLE_TIMEOUT,
+    CONF_KEEP_CONNECTED,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MAX_SILENCE,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_RPM_DEADBAND,
+    CONF_SCAN_INTERVAL,
+    CONF_TEMPERATURE_DEADBAND,
+    CONF_WRITE_DELAY,
+    DEFAULT_HUMIDITY_DEADBAND,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_KEEP_CONNECTED,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MAX_SILENCE,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_RPM_DEADBAND,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    DEFAULT_WRITE_DELAY,
+    DOMAIN,
+    MODES,
+)
+from .deadband import Deadband, SensorFilter
+from .device_info import CachedDevice, DeviceInfoCache
+from .fetch_and_update import FetchAndUpdate
+from .interval import AdaptiveInterval, mode_scan_interval
+from .last_state import LastStateStore
+from .scheduler import PRIORITY_POLL, PRIORITY_WRITE, async_get_scheduler
+from .snapshot import SensorSnapshot
+from .state import DeviceState
+from .timing import (
+    CYCLE_HISTORY_SIZE,
+    CYCLE_POLL,
+    CYCLE_WRITE,
+    PHASE_AUTHENTICATE,
+    PHASE_CONNECT,
+    PHASE_DEVICE_INFORMATION,
+    PHASE_SENSORS,
+    PHASE_WAIT,
+    CycleTiming,
+)
+from .writes import PendingWrites, WriteCoalescer
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FreshIntelliventSkyCoordinator(DataUpdateCoordinator[FreshIntelliVent]):
+    """Poll one Fresh Intellivent Sky fan."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the coordinator."""
+        self.adaptive_interval = AdaptiveInterval(
+            base=entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+            minimum=entry.options.get(
+                CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+            ),
+            maximum=entry.options.get(
+                CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+            ),
+        )
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name=DOMAIN,
+            update_interval=self.adaptive_interval.interval,
+        )
+        self.options = dict(entry.options)
+        self._keep_connected = entry.options.get(
+            CONF_KEEP_CONNECTED, DEFAULT_KEEP_CONNECTED
+        )
+        self.connection = FreshIntelliventConnection(
+            hass,
+            entry.unique_id,
+            keep_connected=self._keep_connected,
+            idle_timeout=entry.options.get(CONF_IDLE_TIMEOUT, DEFAULT_IDLE_TIMEOUT),
+            on_disconnect=self._async_release_slot,
+        )
+        self.scheduler = async_get_scheduler(hass)
+        # The source whose connection slot the open connection holds
+        self._slot_source: str | None = None
+        self.backoff = FailureBackoff()
+        self.device_info = DeviceInfoCache(hass, entry)
+        self.pending = PendingWrites()
+        self.writes = WriteCoalescer(
+            hass,
+            self.pending,
+            delay=entry.options.get(CONF_WRITE_DELAY, DEFAULT_WRITE_DELAY),
+            flush=self.async_write_pending,
+        )
+        self._auth_key = entry.data.get(CONF_AUTH_KEY)
+
+        temperature_deadband = Deadband.parse(
+            entry.options.get(CONF_TEMPERATURE_DEADBAND, DEFAULT_TEMPERATURE_DEADBAND)
+        )
+        self.sensor_filter = SensorFilter(
+            {
+                "temperature": temperature_deadband,
+                "temperature_avg": temperature_deadband,
+                "humidity": Deadband.parse(
+                    entry.options.get(CONF_HUMIDITY_DEADBAND, DEFAULT_HUMIDITY_DEADBAND)
+                ),
+                "rpm": Deadband.parse(
+                    entry.options.get(CONF_RPM_DEADBAND, DEFAULT_RPM_DEADBAND)
+                ),
+            },
+            max_silence=entry.options.get(CONF_MAX_SILENCE, DEFAULT_MAX_SILENCE),
+        )
+
+        self._mode_scan_intervals = {
+            mode: mode_scan_interval(entry.options, mode) for mode in MODES
+        }
+        self._updates: FetchAndUpdate | None = None
+
+        self.last_advertisement: bluetooth.BluetoothServiceInfoBleak | None = None
+        # Sensors parsed from the last advertisement, and when
+        self._advertised_sensors: SkySensors | None = None
+        self._advertised_at: float | None = None
+        # True once parsed advertisements have matched a GATT read
+        self.advertisement_verified = False
+        # When sensors were last pushed by an advertisement or notification
+        self._sensors_pushed_at: float | None = None
+        self.last_cycle: CycleTiming | None = None
+        # Sensor values as of the last update, read by the entities
+        self.sensors: SensorSnapshot | None = None
+        # Mode settings, updated in place after every read and write
+        self.state = DeviceState()
+        self.last_state = LastStateStore(hass, entry.entry_id)
+        # True while the values are restored from before a restart
+        self.restored = False
+        # Values and availability the listeners were last updated with
+        self._published_values: dict[str, Any] = {}
+        self._published_success = True
+        self._published_restored = False
+        self.listener_updates = 0
+        self.suppressed_updates = 0
+        # The last poll and write cycles, for diagnostics
+        self.cycles: deque[CycleTiming] = deque(maxlen=CYCLE_HISTORY_SIZE)
+
+    @property
+    def device(self) -> FreshIntelliVent | CachedDevice | None:
+        """Return the device to create entities for."""
+        if self.data is not None:
+            return self.data
+        return self.device_info.cached_device(self.connection.address)
+
+    async def async_restore(self) -> bool:
+        """Show the values saved before a restart until the first update.
+
+        Returns False if there is nothing to restore, or no device
+        information to create the entities with.
+        """
+        if not self.device_info.info:
+            return False
+        if (last_state := await self.last_state.async_load()) is None:
+            return False
+
+        self.sensors, modes = last_state
+        self.state.update(modes)
+        self.restored = True
+        return True
+
+    @callback
+    def async_start_passive_updates(self) -> CALLBACK_TYPE:
+        """Listen for advertisements from the fan, return a callback to stop."""
+        return bluetooth.async_register_callback(
+            self.hass,
+            self._async_handle_advertisement,
+            bluetooth.BluetoothCallbackMatcher(
+                address=self.connection.address, connectable=False
+            ),
+            bluetooth.BluetoothScanningMode.PASSIVE,
+        )
+
+    @callback
+    def _async_handle_advertisement(
+        self,
+        service_info: bluetooth.BluetoothServiceInfoBleak,
+        change: bluetooth.BluetoothChange,
+    ) -> None:
+        """Update sensors from an advertisement, without connecting."""
+        self.last_advertisement = service_info
+
+        if self.backoff.device_seen():
+            _LOGGER.debug(
+                "%s is advertising again, trying to connect", service_info.address
+            )
+            self.config_entry.async_create_background_task(
+                self.hass,
+                self.async_request_refresh(),
+                f"{DOMAIN} refresh {service_info.address}",
+            )
+
+        sensors = parse_advertisement(service_info)
+        if sensors is None:
+            return
+        self._advertised_sensors = sensors
+        self._advertised_at = time.monotonic()
+        if not self.advertisement_verified or self.data is None:
+            # Checked against the next sensor read before being used
+            return
+
+        for attribute in PASSIVE_SENSOR_ATTRIBUTES:
+            setattr(self.data.sensors, attribute, getattr(sensors, attribute))
+        self._sensors_pushed_at = time.monotonic()
+        self._async_take_snapshot(self.data)
+        self.async_update_listeners()
+
+    @callback
+    def _async_handle_sensor_notification(
+        self, _sender: object, data: bytearray
+    ) -> None:
+        """Update sensors from a notification on an open connection.
+
+        Listeners are updated without touching the poll schedule, which
+        still takes care of the mode settings.
+        """
+        if self.data is None:
+            return
+
+        try:
+            self.data.sensors.parse_data(data)
+        except ValueError as err:
+            _LOGGER.debug("Ignoring sensor notification: %s", err)
+            return
+        self.connection.async_keep_alive()
+        self._sensors_pushed_at = time.monotonic()
+        self._async_take_snapshot(self.data)
+        self.async_update_listeners()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update only the entities whose values changed.
+
+        Entities listen with the `value_key` of what they show as context,
+        or of a whole mode. Listeners without a context, and every listener
+        when availability changes, are always updated.
+        """
+        values = device_values(self.sensors, self.state.as_dict())
+        values.update(self._diagnostic_values())
+        changed = changed_keys(self._published_values, values)
+        self._published_values = values
+
+        update_all = (
+            self.last_update_success != self._published_success
+            or self.restored != self._published_restored
+        )
+        self._published_success = self.last_update_success
+        self._published_restored = self.restored
+
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or update_all or context in changed:
+                self.listener_updates += 1
+                update_callback()
+            else:
+                self.suppressed_updates += 1
+
+    def _diagnostic_values(self) -> dict[str, Any]:
+        """Return what the diagnostic sensors are based on, keyed by `value_key`."""
+        return {
+            value_key(DIAGNOSTICS_KEY, "scan_interval"): self.update_interval,
+            value_key(DIAGNOSTICS_KEY, "last_cycle"): self.last_cycle,
+            value_key(DIAGNOSTICS_KEY, "failures"): self.backoff.failures,
+            value_key(DIAGNOSTICS_KEY, "circuit"): self.backoff.circuit,
+        }
+
+    @callback
+    def _async_take_snapshot(self, client: FreshIntelliVent) -> None:
+        """Take the sensor values the entities will show.
+
+        Readings within the deadband of what is shown are held back, so
+        jitter doesn't write a new state on every update.
+        """
+        sensors = self.sensor_filter.apply(
+            self.sensors, SensorSnapshot.from_sensors(client.sensors)
+        )
+        if sensors != self.sensors:
+            self.sensors = sensors
+
+    def _sensors_pushed_recently(self) -> bool:
+        """Return True if sensors were pushed to us since the last poll."""
+        if self._sensors_pushed_at is None or self.update_interval is None:
+            return False
+        age = time.monotonic() - self._sensors_pushed_at
+        return age < self.update_interval.total_seconds()
+
+    def _status_may_notify(self) -> bool:
+        """Return False if the fan is known not to notify on its status."""
+        return (
+            self.device_info.supports(characteristics.DEVICE_STATUS, "notify")
+            is not False
+        )
+
+    def _last_service_info(self) -> bluetooth.BluetoothServiceInfoBleak | None:
+        """Return how the fan was last heard by a connectable adapter or proxy."""
+        return bluetooth.async_last_service_info(
+            self.hass, self.connection.address, connectable=True
+        )
+
+    @asynccontextmanager
+    async def _async_session(
+        self, priority: int, timing: CycleTiming
+    ) -> AsyncIterator[FreshIntelliVent]:
+        """Wait for the scheduler to hand out a slot, then connect."""
+        # The first refresh runs during setup and is never held back
+        interval = 0
+        if self.data is not None and self.update_interval is not None:
+            interval = self.update_interval.total_seconds()
+
+        if service_info := self._last_service_info():
+            timing.source = service_info.source
+            timing.rssi = service_info.rssi
+
+        started = time.monotonic()
+        source = timing.source or "unknown"
+        await self.scheduler.async_wait_turn(source, priority, interval)
+        if self._slot_source is None:
+            await self.scheduler.async_acquire(source, priority)
+            self._slot_source = source
+        else:
+            # A kept open connection still holds its slot
+            self.scheduler.async_set_idle(
+                self._slot_source, self.config_entry.entry_id, None
+            )
+        timing.add(PHASE_WAIT, time.monotonic() - started)
+
+        try:
+            started = time.monotonic()
+            async with self.connection.async_session() as client:
+                timing.add(PHASE_CONNECT, time.monotonic() - started)
+                gatt_ops = self.connection.gatt_ops
+                gatt_bytes = self.connection.gatt_bytes
+                try:
+                    yield client
+                finally:
+                    timing.gatt_ops = self.connection.gatt_ops - gatt_ops
+                    timing.gatt_bytes = self.connection.gatt_bytes - gatt_bytes
+        finally:
+            if self.connection.is_connected and self._slot_source is not None:
+                self.scheduler.async_set_idle(
+                    self._slot_source,
+                    self.config_entry.entry_id,
+                    self._async_close_idle,
+                )
+            else:
+                self._async_release_slot()
+
+    @callback
+    def _async_release_slot(self) -> None:
+        """Give the connection slot back once the connection is closed."""
+        if self._slot_source is None:
+            return
+        self.scheduler.async_set_idle(
+            self._slot_source, self.config_entry.entry_id, None
+        )
+        self.scheduler.async_release(self._slot_source)
+        self._slot_source = None
+
+    @callback
+    def _async_close_idle(self) -> None:
+        """Close the idle connection, another fan waits for its slot."""
+        _LOGGER.debug(
+            "Closing idle connection to %s to make room", self.connection.address
+        )
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self.connection.async_close_idle(),
+            f"{DOMAIN} close idle {self.connection.address}",
+        )
+
+    @callback
+    def _async_finish_cycle(
+        self, timing: CycleTiming, error: Exception | None = None
+    ) -> None:
+        """Keep the timing of a finished poll or write."""
+        timing.finish(error)
+        self.last_cycle = timing
+        self.cycles.append(timing)
+        _LOGGER.debug(
+            "%s of %s took %.2fs with %s GATT operations: %s",
+            timing.kind,
+            self.connection.address,
+            timing.duration,
+            timing.gatt_ops,
+            {phase: round(seconds, 3) for phase, seconds in timing.phases.items()},
+        )
+
+    def _async_verify_advertisement(self, sensors: SkySensors) -> None:
+        """Compare the last parsed advertisement with sensors read over GATT."""
+        if (
+            self.advertisement_verified
+            or self._advertised_sensors is None
+            or time.monotonic() - self._advertised_at > MATCH_WINDOW
+        ):
+            return
+
+        if matches_read(self._advertised_sensors, sensors):
+            _LOGGER.debug(
+                "Advertisements from %s match its sensors, using them",
+                self.connection.address,
+            )
+            self.advertisement_verified = True
+        else:
+            _LOGGER.debug(
+                "Advertisement from %s doesn't match its sensors: %s",
+                self.connection.address,
+                vars(self._advertised_sensors),
+            )
+
+    @callback
+    def _async_cycle_failed(self, timing: CycleTiming, err: Exception) -> None:
+        """Back off after a failed poll or write, and show it on the sensors.
+
+        The coordinator only updates listeners on the first failure in a
+        row, so the backoff would otherwise not be shown after that.
+        """
+        self._async_finish_cycle(timing, err)
+        self.update_interval = self.backoff.failure()
+        self.async_update_listeners()
+
+    def _has_work(self) -> bool:
+        """Return True if a poll has more to do than reading sensors."""
+        if self.device_info.stale:
+            return True
+        if self._auth_key is None:
+            # Read-only entries only have sensors, the modes are never used
+            return False
+        return self._updates is None or self._updates.has_work()
+
+    def _async_get_updates(self, client: FreshIntelliVent) -> FetchAndUpdate:
+        # Keep the same instance so it knows when each mode was last read
+        if self._updates is None:
+            self._updates = FetchAndUpdate(
+                client=client,
+                pending=self.pending,
+                state=self.state,
+                scan_intervals=self._mode_scan_intervals,
+            )
+        return self._updates
+
+    async def _async_update_data(self) -> FreshIntelliVent:
+        """Get data from Fresh Intellivent Sky."""
+        pushed_sensors = self._sensors_pushed_recently()
+        if pushed_sensors and not self._has_work():
+            # Sensors are pushed to us and nothing else is due
+            self.update_interval = self.adaptive_interval.update(self.data.sensors)
+            return self.data
+
+        if not self.backoff.allows_connect:
+            raise UpdateFailed(
+                f"{self.connection.address} failed {self.backoff.failures} times "
+                "in a row, waiting for it to advertise again"
+            )
+
+        timing = CycleTiming(CYCLE_POLL)
+        try:
+            async with self._async_session(PRIORITY_POLL, timing) as client:
+                authenticated = False
+                if self._auth_key is not None:
+                    with timing.phase(PHASE_AUTHENTICATE):
+                        authenticated = await self.connection.async_authenticate(
+                            self._auth_key
+                        )
+                if self._keep_connected and self._status_may_notify():
+                    await self.connection.async_start_notify(
+                        characteristics.DEVICE_STATUS,
+                        self._async_handle_sensor_notification,
+                    )
+                # Pushed sensors don't say if this connection was accepted
+                if not pushed_sensors or authenticated:
+                    with timing.phase(PHASE_SENSORS):
+                        await client.fetch_sensor_data()
+                    self._async_verify_advertisement(client.sensors)
+                with timing.phase(PHASE_DEVICE_INFORMATION):
+                    await self.device_info.async_update(
+                        client, self.connection.new_connection
+                    )
+                if self._auth_key is not None:
+                    await self._async_get_updates(client).update_all(timing)
+        except UnableToConnect as err:
+            self._async_cycle_failed(timing, err)
+            raise UpdateFailed(str(err)) from err
+        except Exception as err:  # pylint: disable=broad-except
+            self._async_cycle_failed(timing, err)
+            raise UpdateFailed(f"Unable to fetch data: {err}") from err
+
+        self._async_finish_cycle(timing)
+        self.backoff.success()
+        self.update_interval = self.adaptive_interval.update(client.sensors)
+        self._async_take_snapshot(client)
+        self.state.update(client.modes)
+        self.restored = False
+        self.last_state.async_schedule_save(self.sensors, self.state)
+        return client
+
+    async def async_write_pending(self) -> None:
+        """Write pending updates without a full refresh.
+
+        Only the changed modes are written. Their new values are pushed to
+        the entities, while sensors and other modes are left to the normal
+        update schedule.
+        """
+        if self._auth_key is None or self.data is None:
+            await self.async_refresh()
+            return
+
+        if not self.backoff.allows_connect:
+            _LOGGER.debug(
+                "Keeping writes to %s pending until it advertises again",
+                self.connection.address,
+            )
+            return
+
+        timing = CycleTiming(CYCLE_WRITE)
+        try:
+            async with self._async_session(PRIORITY_WRITE, timing) as client:
+                with timing.phase(PHASE_AUTHENTICATE):
+                    if await self.connection.async_authenticate(self._auth_key):
+                        # Confirm the fan accepted the key before writing
+                        await client.fetch_sensor_data()
+                updated = await self._async_get_updates(client).update_pending(timing)
+        except Exception as err:  # pylint: disable=broad-except
+            # The writes stay pending for the next update, which backs off
+            self._async_cycle_failed(timing, err)
+            _LOGGER.warning(
+                "Unable to write to %s, retrying with the next update: %s",
+                self.connection.address,
+                err,
+            )
+            return
+
+        self._async_finish_cycle(timing)
+        if self.backoff.failures:
+            self.backoff.success()
+            self.update_interval = self.adaptive_interval.interval
+        if not updated:
+            # The device didn't report us as authenticated, let a full
+            # update authenticate and write instead
+            await self.async_request_refresh()
+            return
+
+        _LOGGER.debug("Wrote %s to %s", updated, self.connection.address)
+        self.state.update(client.modes)
+        self.adaptive_interval.note_write()
+        self.async_update_listeners()
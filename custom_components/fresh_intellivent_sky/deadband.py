@@ -0,0 +1,82 @@
+"""Deadband filtering of published sensor values for Fresh Intellivent Sky."""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, replace
+from typing import Any
+
+from .snapshot import SensorSnapshot
+
+
+@dataclass(frozen=True, slots=True)
+class Deadband:
+    """How much a value has to move before it is published."""
+
+    value: float
+    percent: bool = False
+
+    @classmethod
+    def parse(cls, text: str) -> Deadband:
+        """Parse an absolute deadband such as `0.2`, or a relative one like `2%`."""
+        text = text.strip()
+        percent = text.endswith("%")
+        value = float(text.removesuffix("%"))
+        if value < 0:
+            raise ValueError(f"Deadband can't be negative: {text}")
+        return cls(value, percent)
+
+    def exceeded(self, published: float, value: float) -> bool:
+        """Return True if a value has moved out of the band."""
+        limit = abs(published) * self.value / 100 if self.percent else self.value
+        return abs(value - published) > limit
+
+
+class SensorFilter:
+    """Hold back sensor values that only jitter around the published one.
+
+    Each filtered sensor keeps its published value until a new reading
+    leaves the deadband around it, or until the value has been held back
+    for `max_silence` seconds. Other sensors are always published, as is
+    the first reading replacing a value this filter didn't publish, such
+    as one restored from before a restart.
+    """
+
+    def __init__(self, deadbands: dict[str, Deadband], max_silence: float) -> None:
+        """Initialize the filter, a max silence of 0 never forces a value out."""
+        self._deadbands = deadbands
+        self._max_silence = max_silence
+        # When each sensor last had a new value published
+        self._published_at: dict[str, float] = {}
+        # Readings held back per sensor
+        self.suppressed: dict[str, int] = {name: 0 for name in deadbands}
+
+    def apply(
+        self, published: SensorSnapshot | None, sensors: SensorSnapshot
+    ) -> SensorSnapshot:
+        """Return the values to publish, given the ones published last."""
+        now = time.monotonic()
+        held: dict[str, Any] = {}
+        for name, deadband in self._deadbands.items():
+            value = getattr(sensors, name)
+            old = None if published is None else getattr(published, name)
+            if value == old:
+                continue
+            if (
+                old is not None
+                and value is not None
+                and not deadband.exceeded(old, value)
+                and not self._silent_for_too_long(name, now)
+            ):
+                held[name] = old
+                self.suppressed[name] += 1
+                continue
+            self._published_at[name] = now
+
+        return replace(sensors, **held) if held else sensors
+
+    def _silent_for_too_long(self, name: str, now: float) -> bool:
+        if name not in self._published_at:
+            return True
+        if not self._max_silence:
+            return False
+        return now - self._published_at[name] >= self._max_silence
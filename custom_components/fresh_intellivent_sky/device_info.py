@@ -0,0 +1,181 @@
+"""Persisted device information for Fresh Intellivent Sky."""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.storage import Store
+from pyfreshintellivent import FreshIntelliVent, characteristics
+
+from .const import CONF_DEVICE_INFO, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+DEVICE_INFO_ATTRIBUTES = ["name", "manufacturer", "model", "hw_version", "fw_version"]
+
+
+def _storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.{entry_id}.device"
+
+
+async def async_remove_device_store(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove what was persisted for a config entry."""
+    await Store(hass, STORAGE_VERSION, _storage_key(entry_id)).async_remove()
+
+
+async def async_read_firmware_version(client: FreshIntelliVent) -> str:
+    """Read only the firmware version from a connected device."""
+    fw_version = await client._client.read_gatt_char(
+        char_specifier=characteristics.FIRMWARE_VERSION
+    )
+    return fw_version.decode("utf-8")
+
+
+@dataclass(slots=True)
+class CachedDevice:
+    """Device information to create entities with before connecting."""
+
+    address: str
+    name: str | None = None
+    manufacturer: str | None = None
+    model: str | None = None
+    hw_version: str | None = None
+    fw_version: str | None = None
+
+
+class DeviceInfoCache:
+    """Device information and GATT layout, persisted per config entry.
+
+    Everything is stored together with the firmware version it was read
+    from. A full fetch is only done when nothing is stored, when the
+    firmware version read on a new connection differs from the stored one,
+    or after `invalidate` has been called.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the cache, call `async_load` before using it."""
+        self._hass = hass
+        self._entry = entry
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, _storage_key(entry.entry_id)
+        )
+        self._info: dict[str, Any] = {}
+        # Characteristic UUID to its properties, such as "read" or "notify"
+        self._characteristics: dict[str, list[str]] = {}
+        self._stale = True
+
+    @property
+    def info(self) -> dict[str, Any]:
+        """Return the cached device information."""
+        return self._info
+
+    def cached_device(self, address: str) -> CachedDevice | None:
+        """Return the cached device information, if any was stored."""
+        if not self._info:
+            return None
+        return CachedDevice(
+            address,
+            **{
+                attribute: self._info.get(attribute)
+                for attribute in DEVICE_INFO_ATTRIBUTES
+            },
+        )
+
+    async def async_load(self) -> None:
+        """Load what was stored for this config entry."""
+        if (data := await self._store.async_load()) is None:
+            # Move device information cached in the config entry by
+            # earlier versions over to the store
+            if (info := self._entry.data.get(CONF_DEVICE_INFO)) is None:
+                return
+            data = {"device_info": info, "characteristics": {}}
+            self._hass.config_entries.async_update_entry(
+                self._entry,
+                data={
+                    key: value
+                    for key, value in self._entry.data.items()
+                    if key != CONF_DEVICE_INFO
+                },
+            )
+            await self._store.async_save(data)
+
+        self._info = data["device_info"]
+        self._characteristics = data["characteristics"]
+        self._stale = not self._info
+
+    @property
+    def stale(self) -> bool:
+        """Return True if device information has to be fetched again."""
+        return self._stale
+
+    def invalidate(self) -> None:
+        """Fetch device information again on the next update."""
+        self._stale = True
+
+    def supports(self, uuid: UUID, prop: str) -> bool | None:
+        """Return if a characteristic has a property, None if not known yet."""
+        if not self._characteristics:
+            return None
+        return prop in self._characteristics.get(str(uuid), [])
+
+    async def async_update(
+        self, client: FreshIntelliVent, new_connection: bool
+    ) -> None:
+        """Make sure the client carries current device information."""
+        if not self._stale and new_connection:
+            fw_version = await async_read_firmware_version(client)
+            if fw_version != self._info.get("fw_version"):
+                _LOGGER.info(
+                    "Firmware of %s changed from %s to %s",
+                    client.address,
+                    self._info.get("fw_version"),
+                    fw_version,
+                )
+                self._stale = True
+
+        if not self._stale:
+            for attribute in DEVICE_INFO_ATTRIBUTES:
+                setattr(client, attribute, self._info.get(attribute))
+            return
+
+        await client.fetch_device_information()
+        self._stale = False
+
+        info = {
+            attribute: getattr(client, attribute)
+            for attribute in DEVICE_INFO_ATTRIBUTES
+        }
+        layout = {
+            str(characteristic.uuid): list(characteristic.properties)
+            for characteristic in client._client.services.characteristics.values()
+        }
+        if info == self._info and layout == self._characteristics:
+            return
+
+        self._info = info
+        self._characteristics = layout
+        await self._store.async_save({"device_info": info, "characteristics": layout})
+        self._async_update_device_registry(client.address)
+
+    def _async_update_device_registry(self, address: str) -> None:
+        device_registry = dr.async_get(self._hass)
+        device = device_registry.async_get_device(
+            connections={(dr.CONNECTION_BLUETOOTH, address)}
+        )
+        if device is None:
+            return
+
+        device_registry.async_update_device(
+            device.id,
+            manufacturer=self._info["manufacturer"],
+            model=self._info["model"],
+            hw_version=self._info["hw_version"],
+            sw_version=self._info["fw_version"],
+        )
@@ -0,0 +1,52 @@
+"""Diagnostics support for Fresh Intellivent Sky."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_AUTH_KEY, DOMAIN
+from .coordinator import FreshIntelliventSkyCoordinator
+
+TO_REDACT = {CONF_AUTH_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: FreshIntelliventSkyCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "device_info": coordinator.device_info.info,
+        "sensors": coordinator.sensors.as_dict() if coordinator.sensors else None,
+        "modes": coordinator.state.as_dict(),
+        "restored": coordinator.restored,
+        "advertisement_verified": coordinator.advertisement_verified,
+        "scan_interval": (
+            coordinator.update_interval.total_seconds()
+            if coordinator.update_interval
+            else None
+        ),
+        "backoff": {
+            "failures": coordinator.backoff.failures,
+            "circuit": coordinator.backoff.circuit,
+        },
+        "writes": {
+            "queued": coordinator.writes.queued,
+            "merged": coordinator.writes.merged,
+            "flushes": coordinator.writes.flushes,
+        },
+        "listeners": {
+            "updates": coordinator.listener_updates,
+            "suppressed": coordinator.suppressed_updates,
+        },
+        "sensor_filter": {"suppressed": coordinator.sensor_filter.suppressed},
+        "cycles": [cycle.as_dict() for cycle in coordinator.cycles],
+    }
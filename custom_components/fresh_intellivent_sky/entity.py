@@ -0,0 +1,20 @@
+"""Base entity for Fresh Intellivent Sky."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import ATTR_STALE
+from .coordinator import FreshIntelliventSkyCoordinator
+
+
+class FreshIntelliventSkyEntity(CoordinatorEntity[FreshIntelliventSkyCoordinator]):
+    """Entity showing values of a fan, restored or read from it."""
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Note when the value was restored rather than read from the fan."""
+        if self.coordinator.restored:
+            return {ATTR_STALE: True}
+        return None
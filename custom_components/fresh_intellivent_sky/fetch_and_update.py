@@ -1,7 +1,8 @@
+import asyncio
 import logging
+import time
 
-from homeassistant.core import HomeAssistant
-from pyfreshintellivent import FreshIntelliVent
+from pyfreshintellivent import FreshIntelliVent, FreshIntelliventError
 
 from .const import (
     AIRING_MODE_UPDATE,
@@ -13,10 +14,17 @@ from .const import (
     HUMIDITY_MODE_UPDATE,
     LIGHT_AND_VOC_MODE_UPDATE,
     MINUTES_KEY,
+    MODES,
     PAUSE_UPDATE,
     RPM_KEY,
     TIMER_MODE_UPDATE,
 )
+from .state import DeviceState
+from .timing import CycleTiming, read_phase, timed, write_phase
+from .writes import PendingWrites, merge_values
+
+# Mode reads in flight at once, most stacks queue or pipeline a few
+MAX_CONCURRENT_READS = 3
 
 UPDATE_NEEDED = "update_needed"
 UPDATE_DONE = "update_done"
@@ -25,92 +33,256 @@ _LOGGER = logging.getLogger(__name__)
 
 
 class FetchAndUpdate:
-    def __init__(self, hass: HomeAssistant, client: FreshIntelliVent):
-        self._hass = hass
+    def __init__(
+        self,
+        client: FreshIntelliVent,
+        pending: PendingWrites,
+        state: DeviceState,
+        scan_intervals: dict[str, float] | None = None,
+        max_concurrent_reads: int = MAX_CONCURRENT_READS,
+    ):
         self._client = client
+        self._pending = pending
+        # Current mode settings, which unchanged values are written from
+        self._state = state
+        # Mode reads in flight at once, 1 reads them one at a time
+        self.max_concurrent_reads = max_concurrent_reads
 
         self._is_authenticated = client.sensors.authenticated
 
-    async def update_all(self):
-        await self._update_boost()
-        await self._update_pause()
-        await self._fetch_and_update_airing()
-        await self._fetch_and_update_constant_speed()
-        await self._fetch_and_update_humidity()
-        await self._fetch_and_update_light_and_voc()
-        await self._fetch_and_update_timer()
+        # Seconds between reads of each mode, modes not listed are read every time
+        self._scan_intervals = scan_intervals or {}
+        self._last_fetched: dict[str, float] = {}
+
+    def _is_stale(self, mode: str) -> bool:
+        if mode not in self._client.modes or mode not in self._last_fetched:
+            return True
+        age = time.monotonic() - self._last_fetched[mode]
+        return age >= self._scan_intervals.get(mode, 0)
+
+    def has_work(self) -> bool:
+        """Return True if anything needs to be written or read."""
+        return len(self._pending) > 0 or any(self._is_stale(mode) for mode in MODES)
+
+    def _mark_fetched(self, mode: str):
+        self._last_fetched[mode] = time.monotonic()
+
+    def _with_current(self, mode: str, values: dict) -> dict:
+        """Fill in the values that weren't changed from the current mode."""
+        return merge_values(self._state.mode_values(mode), values)
+
+    async def update_all(self, timing: CycleTiming | None = None):
+        self._is_authenticated = self._client.sensors.authenticated
+
+        written = await self._write_pending(timing)
+
+        # A mode that was just written doesn't need to be read back
+        await self._fetch_modes(
+            [mode for mode in MODES if mode not in written and self._is_stale(mode)],
+            timing,
+        )
+
+    async def _fetch_modes(self, modes: list[str], timing: CycleTiming | None):
+        """Read modes, a few at a time if the device keeps up.
+
+        If concurrent reads fail but reading them again one at a time works,
+        the device or proxy can't handle them and modes are read one at a
+        time from then on. If reading one at a time fails as well, the
+        connection was the problem and concurrent reads are kept.
+        """
+        if self.max_concurrent_reads > 1 and len(modes) > 1:
+            try:
+                await self._fetch_concurrently(modes, timing)
+                return
+            except (FreshIntelliventError, TimeoutError) as err:
+                _LOGGER.debug(
+                    "Concurrent reads from %s failed, retrying one at a time: %s",
+                    self._client.address,
+                    err,
+                )
+
+            await self._fetch_sequentially(
+                [mode for mode in modes if self._is_stale(mode)], timing
+            )
+            _LOGGER.info(
+                "%s failed concurrent reads, reading one at a time from now on",
+                self._client.address,
+            )
+            self.max_concurrent_reads = 1
+            return
+
+        await self._fetch_sequentially(modes, timing)
+
+    async def _fetch_sequentially(
+        self, modes: list[str], timing: CycleTiming | None
+    ) -> None:
+        for mode in modes:
+            await self._fetch_mode(mode, timing)
+
+    async def _fetch_concurrently(
+        self, modes: list[str], timing: CycleTiming | None
+    ) -> None:
+        semaphore = asyncio.Semaphore(self.max_concurrent_reads)
 
-    async def _update_boost(self):
-        boost = self._hass.data.get(BOOST_UPDATE)
+        async def _fetch(mode: str) -> None:
+            async with semaphore:
+                await self._fetch_mode(mode, timing)
+
+        # Let every read finish before raising, so none is left in flight
+        results = await asyncio.gather(
+            *(_fetch(mode) for mode in modes), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def _fetch_mode(self, mode: str, timing: CycleTiming | None) -> None:
+        fetch = {
+            "airing": self._client.fetch_airing,
+            "constant_speed": self._client.fetch_constant_speed,
+            "humidity": self._client.fetch_humidity,
+            "light_and_voc": self._client.fetch_light_and_voc,
+            "timer": self._client.fetch_timer,
+        }[mode]
+        with timed(timing, read_phase(mode)):
+            await fetch()
+        self._mark_fetched(mode)
+
+    async def update_pending(self, timing: CycleTiming | None = None) -> list[str]:
+        """Only write pending updates, nothing is read.
+
+        Returns the modes that were written.
+        """
+        self._is_authenticated = self._client.sensors.authenticated
+        return await self._write_pending(timing)
+
+    async def _write_pending(self, timing: CycleTiming | None) -> list[str]:
+        """Write pending updates one at a time, in order.
+
+        Returns the modes that were written, only those are timed.
+        """
+        written = []
+        for mode, update in (
+            ("boost", self._update_boost),
+            ("pause", self._update_pause),
+            ("airing", self._update_airing),
+            ("constant_speed", self._update_constant_speed),
+            ("humidity", self._update_humidity),
+            ("light_and_voc", self._update_light_and_voc),
+            ("timer", self._update_timer),
+        ):
+            started = time.monotonic()
+            if await update():
+                written.append(mode)
+                if timing is not None:
+                    timing.add(write_phase(mode), time.monotonic() - started)
+
+        return written
+
+    async def _update_boost(self) -> bool:
+        if self._is_authenticated is not True:
+            return False
+
+        with self._pending.take(BOOST_UPDATE) as boost:
+            if boost is None:
+                return False
 
-        if boost is not None and self._is_authenticated is True:
             await self._client.update_boost(
                 enabled=boost[ENABLED_KEY],
                 rpm=boost[RPM_KEY],
                 seconds=boost[MINUTES_KEY],
             )
             _LOGGER.debug("Updated boost: %s", boost)
-            self._hass.data[BOOST_UPDATE] = None
+            return True
+
+    async def _update_pause(self) -> bool:
+        if self._is_authenticated is not True:
+            return False
 
-    async def _update_pause(self):
-        pause = self._hass.data.get(PAUSE_UPDATE)
+        with self._pending.take(PAUSE_UPDATE) as pause:
+            if pause is None:
+                return False
 
-        if pause is not None and self._is_authenticated is True:
             await self._client.update_pause(
                 enabled=bool(pause[ENABLED_KEY]),
                 seconds=int(pause[MINUTES_KEY]),
             )
             _LOGGER.debug("Updated pause: %s", pause)
-            self._hass.data[PAUSE_UPDATE] = None
+            return True
 
-    async def _fetch_and_update_airing(self):
-        airing_mode = self._hass.data.get(AIRING_MODE_UPDATE)
+    async def _update_airing(self) -> bool:
+        if self._is_authenticated is not True:
+            return False
 
-        if airing_mode is not None and self._is_authenticated is True:
+        with self._pending.take(AIRING_MODE_UPDATE) as airing_mode:
+            if airing_mode is None:
+                return False
+
+            airing_mode = self._with_current("airing", airing_mode)
             await self._client.update_airing(
                 enabled=bool(airing_mode[ENABLED_KEY]),
                 minutes=int(airing_mode[MINUTES_KEY]),
                 rpm=int(airing_mode[RPM_KEY]),
             )
             _LOGGER.debug("Updated airing mode: %s", airing_mode)
-            self._hass.data[AIRING_MODE_UPDATE] = None
-        else:
-            await self._client.fetch_airing()
+            self._mark_fetched("airing")
+            return True
+
+    async def _update_constant_speed(self) -> bool:
+        if self._is_authenticated is not True:
+            return False
 
-    async def _fetch_and_update_constant_speed(self):
-        constant_speed = self._hass.data.get(CONSTANT_SPEED_UPDATE)
+        with self._pending.take(CONSTANT_SPEED_UPDATE) as constant_speed:
+            if constant_speed is None:
+                return False
 
-        if constant_speed is not None and self._is_authenticated is True:
+            constant_speed = self._with_current("constant_speed", constant_speed)
             await self._client.update_constant_speed(
                 enabled=constant_speed[ENABLED_KEY],
                 rpm=constant_speed[RPM_KEY],
             )
             _LOGGER.debug("Updated constant speed: %s", constant_speed)
-            self._hass.data[CONSTANT_SPEED_UPDATE] = None
-        else:
-            await self._client.fetch_constant_speed()
+            self._mark_fetched("constant_speed")
+            return True
 
-    async def _fetch_and_update_humidity(self):
-        humidity_mode = self._hass.data.get(HUMIDITY_MODE_UPDATE)
+    async def _update_humidity(self) -> bool:
+        if self._is_authenticated is not True:
+            return False
 
-        if humidity_mode is not None and self._is_authenticated is True:
+        with self._pending.take(HUMIDITY_MODE_UPDATE) as humidity_mode:
+            if humidity_mode is None:
+                return False
+
+            humidity_mode = self._with_current("humidity", humidity_mode)
             await self._client.update_humidity(
                 enabled=bool(humidity_mode[ENABLED_KEY]),
                 detection=humidity_mode[DETECTION_KEY],
                 rpm=int(humidity_mode[RPM_KEY]),
             )
             _LOGGER.debug("Updated humidity mode: %s", humidity_mode)
-            self._hass.data[HUMIDITY_MODE_UPDATE] = None
-        else:
-            await self._client.fetch_humidity()
+            self._mark_fetched("humidity")
+            return True
+
+    async def _update_light_and_voc(self) -> bool:
+        if self._is_authenticated is not True:
+            return False
 
-    async def _fetch_and_update_light_and_voc(self):
-        light_and_voc_mode = self._hass.data.get(LIGHT_AND_VOC_MODE_UPDATE)
+        with self._pending.take(LIGHT_AND_VOC_MODE_UPDATE) as light_and_voc_mode:
+            if light_and_voc_mode is None:
+                return False
 
-        if light_and_voc_mode is not None and self._is_authenticated is True:
             light = "light_"
             voc = "voc_"
 
+            current = self._state.light_and_voc
+            light_and_voc_mode = {
+                light + ENABLED_KEY: current.light.enabled,
+                light + DETECTION_KEY: current.light.detection,
+                voc + ENABLED_KEY: current.voc.enabled,
+                voc + DETECTION_KEY: current.voc.detection,
+                **light_and_voc_mode,
+            }
+
             await self._client.update_light_and_voc(
                 light_enabled=bool(light_and_voc_mode[light + ENABLED_KEY]),
                 light_detection=light_and_voc_mode[light + DETECTION_KEY],
@@ -118,14 +290,18 @@ class FetchAndUpdate:
                 voc_detection=light_and_voc_mode[voc + DETECTION_KEY],
             )
             _LOGGER.debug("Updated light and voc mode: %s", light_and_voc_mode)
-            self._hass.data[LIGHT_AND_VOC_MODE_UPDATE] = None
-        else:
-            await self._client.fetch_light_and_voc()
+            self._mark_fetched("light_and_voc")
+            return True
+
+    async def _update_timer(self) -> bool:
+        if self._is_authenticated is not True:
+            return False
 
-    async def _fetch_and_update_timer(self):
-        timer_mode = self._hass.data.get(TIMER_MODE_UPDATE)
+        with self._pending.take(TIMER_MODE_UPDATE) as timer_mode:
+            if timer_mode is None:
+                return False
 
-        if timer_mode is not None and self._is_authenticated is True:
+            timer_mode = self._with_current("timer", timer_mode)
             await self._client.update_timer(
                 minutes=timer_mode[MINUTES_KEY],
                 delay_enabled=timer_mode[DELAY_KEY][ENABLED_KEY],
@@ -133,6 +309,5 @@ class FetchAndUpdate:
                 rpm=timer_mode[RPM_KEY],
             )
             _LOGGER.debug("Updated timer mode: %s", timer_mode)
-            self._hass.data[TIMER_MODE_UPDATE] = None
-        else:
-            await self._client.fetch_timer()
+            self._mark_fetched("timer")
+            return True
@@ -0,0 +1,124 @@
+"""Adaptive scan interval for Fresh Intellivent Sky."""
+from __future__ import annotations
+
+import time
+from collections.abc import Mapping
+from datetime import timedelta
+from typing import Any
+
+from pyfreshintellivent.sensors import SkySensors
+
+from .const import (
+    CONF_MODE_SCAN_INTERVAL,
+    CONF_MODE_SCAN_INTERVALS,
+    DEFAULT_MODE_SCAN_INTERVALS,
+)
+
+# Modes that only last for a while, the fan is busy when in one of them
+ACTIVE_MODES = ["Pause", "Light", "Timer", "Humidity", "VOC", "Boost"]
+
+# How long a user write counts as activity
+WRITE_ACTIVITY_SECONDS = 300
+
+# Humidity rising faster than this (%/minute) counts as activity
+HUMIDITY_RISE_PER_MINUTE = 1.0
+
+# Changes smaller than these between polls count as stable readings
+STABLE_HUMIDITY_DELTA = 1.0
+STABLE_TEMPERATURE_DELTA = 0.5
+
+BACKOFF_FACTOR = 1.5
+
+
+class AdaptiveInterval:
+    """Pick the next scan interval from what the fan is doing.
+
+    The interval drops to `minimum` while the fan is active, stays at
+    `base` while readings are moving, and backs off towards `maximum`
+    while the fan is idle and readings are stable.
+    """
+
+    def __init__(self, base: float, minimum: float, maximum: float) -> None:
+        """Initialize the interval."""
+        # The configured scan interval is always within the bounds
+        self._minimum = min(minimum, base)
+        self._maximum = max(maximum, base)
+        self._base = base
+        self._interval = base
+
+        self._humidity: float | None = None
+        self._temperature: float | None = None
+        self._read_at: float | None = None
+        self._written_at: float | None = None
+
+    @property
+    def interval(self) -> timedelta:
+        """Return the current interval."""
+        return timedelta(seconds=self._interval)
+
+    def note_write(self) -> None:
+        """Note that the user changed something."""
+        self._written_at = time.monotonic()
+
+    def update(self, sensors: SkySensors) -> timedelta:
+        """Calculate the next interval from the latest sensor values."""
+        now = time.monotonic()
+
+        if self._is_active(sensors, now):
+            self._interval = self._minimum
+        elif self._is_stable(sensors):
+            self._interval = self._clamp(
+                max(self._interval, self._base) * BACKOFF_FACTOR
+            )
+        else:
+            self._interval = self._base
+
+        self._humidity = sensors.humidity
+        self._temperature = sensors.temperature
+        self._read_at = now
+
+        return self.interval
+
+    def _is_active(self, sensors: SkySensors, now: float) -> bool:
+        if sensors.mode in ACTIVE_MODES:
+            return True
+
+        if self._written_at is not None and now - self._written_at < (
+            WRITE_ACTIVITY_SECONDS
+        ):
+            return True
+
+        if (
+            self._humidity is None
+            or sensors.humidity is None
+            or self._read_at is None
+            or now <= self._read_at
+        ):
+            return False
+
+        minutes = (now - self._read_at) / 60
+        return (sensors.humidity - self._humidity) / minutes > HUMIDITY_RISE_PER_MINUTE
+
+    def _is_stable(self, sensors: SkySensors) -> bool:
+        return _changed_less_than(
+            self._humidity, sensors.humidity, STABLE_HUMIDITY_DELTA
+        ) and _changed_less_than(
+            self._temperature, sensors.temperature, STABLE_TEMPERATURE_DELTA
+        )
+
+    def _clamp(self, seconds: float) -> float:
+        return min(self._maximum, max(self._minimum, seconds))
+
+
+def _changed_less_than(old: float | None, new: float | None, delta: float) -> bool:
+    if old is None or new is None:
+        return False
+    return abs(new - old) < delta
+
+
+def mode_scan_interval(options: Mapping[str, Any], mode: str) -> int:
+    """Return the configured seconds between reads of a mode."""
+    return options.get(
+        CONF_MODE_SCAN_INTERVALS[mode],
+        options.get(CONF_MODE_SCAN_INTERVAL, DEFAULT_MODE_SCAN_INTERVALS[mode]),
+    )
@@ -0,0 +1,53 @@
+"""Last known values of a Fresh Intellivent Sky fan, kept across restarts."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .snapshot import SensorSnapshot
+from .state import DeviceState
+
+STORAGE_VERSION = 1
+
+# Seconds to collect polls before writing the last known values to disk
+SAVE_DELAY = 60
+
+
+def _storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.{entry_id}.last_state"
+
+
+async def async_remove_last_state_store(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the last known values of a config entry."""
+    await Store(hass, STORAGE_VERSION, _storage_key(entry_id)).async_remove()
+
+
+class LastStateStore:
+    """The sensor values and mode settings of the last successful poll.
+
+    Saves are delayed and merged, so frequent polls don't mean frequent
+    disk writes. Home Assistant writes a pending save when it stops.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, _storage_key(entry_id)
+        )
+
+    async def async_load(self) -> tuple[SensorSnapshot, dict[str, Any]] | None:
+        """Return the last known sensor values and mode settings, if saved."""
+        if (data := await self._store.async_load()) is None:
+            return None
+        return SensorSnapshot.from_dict(data["sensors"]), data["modes"]
+
+    @callback
+    def async_schedule_save(self, sensors: SensorSnapshot, state: DeviceState) -> None:
+        """Save the values of a successful poll a while from now."""
+        self._store.async_delay_save(
+            lambda: {"sensors": sensors.as_dict(), "modes": state.as_dict()},
+            SAVE_DELAY,
+        )
@@ -10,17 +10,13 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import CONNECTION_BLUETOOTH
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
 from pyfreshintellivent import FreshIntelliVent
 
+from .changes import MODES_KEY, value_key
 from .const import (
     AIRING_MODE_UPDATE,
     CONSTANT_SPEED_UPDATE,
     DELAY_KEY,
-    DETECTION_KEY,
     DOMAIN,
     ENABLED_KEY,
     HUMIDITY_MODE_UPDATE,
@@ -28,6 +24,10 @@ from .const import (
     RPM_KEY,
     TIMER_MODE_UPDATE,
 )
+from .coordinator import FreshIntelliventSkyCoordinator
+from .device_info import CachedDevice
+from .entity import FreshIntelliventSkyEntity
+from .state import state_accessor
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,7 +38,7 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up sensors dynamically through discovery."""
-    coordinator: DataUpdateCoordinator[FreshIntelliVent] = hass.data[DOMAIN][
+    coordinator: FreshIntelliventSkyCoordinator = hass.data[DOMAIN][
         config_entry.entry_id
     ]
 
@@ -46,7 +46,7 @@ async def async_setup_entry(
         [
             FreshIntelliventSkyNumber(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 NumberEntityDescription(
                     key="humidity_and_voc_rpm",
                     name="Humidity and VOC",
@@ -60,7 +60,7 @@ async def async_setup_entry(
             ),
             FreshIntelliventSkyNumber(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 NumberEntityDescription(
                     key="constant_speed_rpm",
                     name="Constant speed",
@@ -74,7 +74,7 @@ async def async_setup_entry(
             ),
             FreshIntelliventSkyNumber(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 NumberEntityDescription(
                     key="airing_rpm",
                     name="Airing",
@@ -88,7 +88,7 @@ async def async_setup_entry(
             ),
             FreshIntelliventSkyNumber(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 NumberEntityDescription(
                     key="airing_minutes",
                     name="Airing minutes",
@@ -102,7 +102,7 @@ async def async_setup_entry(
             ),
             FreshIntelliventSkyNumber(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 NumberEntityDescription(
                     key="timer_and_light_rpm",
                     name="Timer and light",
@@ -116,7 +116,7 @@ async def async_setup_entry(
             ),
             FreshIntelliventSkyNumber(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 NumberEntityDescription(
                     key="timer_minutes",
                     name="Timer minutes",
@@ -130,7 +130,7 @@ async def async_setup_entry(
             ),
             FreshIntelliventSkyNumber(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 NumberEntityDescription(
                     key="timer_delay_minutes",
                     name="Timer delay minutes",
@@ -146,31 +146,30 @@ async def async_setup_entry(
     )
 
 
-class FreshIntelliventSkyNumber(
-    CoordinatorEntity[DataUpdateCoordinator[FreshIntelliVent]], NumberEntity
-):
+class FreshIntelliventSkyNumber(FreshIntelliventSkyEntity, NumberEntity):
     """Fresh Intellivent Sky numbers for the device."""
 
     _attr_has_entity_name = True
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
-        device: FreshIntelliVent,
+        coordinator: FreshIntelliventSkyCoordinator,
+        device: FreshIntelliVent | CachedDevice,
         entity_description: NumberEntityDescription,
         entity_category: EntityCategory | None = None,
         keys: list | None = None,
     ) -> None:
         """Populate the entity with relevant data."""
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator, context=value_key(MODES_KEY, *keys) if keys else None
+        )
         self.entity_description = entity_description
 
         name = f"{device.manufacturer} {device.name}"
 
-        self.device = device
         self._attr_unique_id = f"{device.manufacturer}_{name}_{entity_description.key}"
         self._attr_entity_category = entity_category
-        self._keys = keys
+        self._value = state_accessor(keys) if keys else None
         self._id = device.address
         self._attr_device_info = DeviceInfo(
             connections={
@@ -189,72 +188,37 @@ class FreshIntelliventSkyNumber(
     @property
     def native_value(self) -> float | None:
         """Return the reported value."""
-        if self._keys is None:
+        if self._value is None:
             return None
-        value = self.coordinator.data.modes
-        for key in self._keys:
-            if value.get(key) is None:
-                return None
-            value = value[key]
-
-        return value
+        return self._value(self.coordinator.state)
 
     async def async_set_native_value(self, value: float) -> None:
         """Set value."""
         key = self.entity_description.key
+        writes = self.coordinator.writes
 
         if key == "humidity_and_voc_rpm":
-            self.coordinator.hass.data[HUMIDITY_MODE_UPDATE] = {
-                ENABLED_KEY: self.device.modes["humidity"][ENABLED_KEY],
-                DETECTION_KEY: self.device.modes["humidity"][DETECTION_KEY],
-                RPM_KEY: int(value),
-            }
+            await writes.async_queue(HUMIDITY_MODE_UPDATE, {RPM_KEY: int(value)})
         elif key == "constant_speed_rpm":
-            self.coordinator.hass.data[CONSTANT_SPEED_UPDATE] = {
-                ENABLED_KEY: self.device.modes["constant_speed"][ENABLED_KEY],
-                RPM_KEY: int(value),
-            }
+            await writes.async_queue(CONSTANT_SPEED_UPDATE, {RPM_KEY: int(value)})
         elif key == "airing_rpm":
-            self.coordinator.hass.data[AIRING_MODE_UPDATE] = {
-                ENABLED_KEY: self.device.modes["airing"][ENABLED_KEY],
-                MINUTES_KEY: self.device.modes["airing"][MINUTES_KEY],
-                RPM_KEY: int(value),
-            }
+            await writes.async_queue(AIRING_MODE_UPDATE, {RPM_KEY: int(value)})
         elif key == "airing_minutes":
-            self.coordinator.hass.data[AIRING_MODE_UPDATE] = {
-                ENABLED_KEY: self.device.modes["airing"][ENABLED_KEY],
-                MINUTES_KEY: int(value),
-                RPM_KEY: self.device.modes["airing"][RPM_KEY],
-            }
+            await writes.async_queue(AIRING_MODE_UPDATE, {MINUTES_KEY: int(value)})
         elif key == "timer_and_light_rpm":
-            self.coordinator.hass.data[TIMER_MODE_UPDATE] = {
-                MINUTES_KEY: self.device.modes["timer"][MINUTES_KEY],
-                DELAY_KEY: {
-                    ENABLED_KEY: self.device.modes["timer"][DELAY_KEY][ENABLED_KEY],
-                    MINUTES_KEY: self.device.modes["timer"][DELAY_KEY][MINUTES_KEY],
-                },
-                RPM_KEY: int(value),
-            }
+            await writes.async_queue(TIMER_MODE_UPDATE, {RPM_KEY: int(value)})
         elif key == "timer_minutes":
-            self.coordinator.hass.data[TIMER_MODE_UPDATE] = {
-                MINUTES_KEY: int(value),
-                DELAY_KEY: {
-                    ENABLED_KEY: self.device.modes["timer"][DELAY_KEY][ENABLED_KEY],
-                    MINUTES_KEY: self.device.modes["timer"][DELAY_KEY][MINUTES_KEY],
-                },
-                RPM_KEY: self.device.modes["timer"][RPM_KEY],
-            }
+            await writes.async_queue(TIMER_MODE_UPDATE, {MINUTES_KEY: int(value)})
         elif key == "timer_delay_minutes":
             delay_minutes = int(value)
             delay_enabled = delay_minutes > 0
 
-            self.coordinator.hass.data[TIMER_MODE_UPDATE] = {
-                MINUTES_KEY: self.device.modes["timer"][MINUTES_KEY],
-                DELAY_KEY: {
-                    ENABLED_KEY: delay_enabled,
-                    MINUTES_KEY: delay_minutes,
+            await writes.async_queue(
+                TIMER_MODE_UPDATE,
+                {
+                    DELAY_KEY: {
+                        ENABLED_KEY: delay_enabled,
+                        MINUTES_KEY: delay_minutes,
+                    },
                 },
-                RPM_KEY: self.device.modes["timer"][RPM_KEY],
-            }
-
-        await self.coordinator.async_request_refresh()
+            )
@@ -0,0 +1,50 @@
+"""Device information probed during setup, shared by all config flows."""
+from __future__ import annotations
+
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+from pyfreshintellivent import FreshIntelliVent
+
+from .const import DOMAIN
+
+DATA_PROBE_CACHE = f"{DOMAIN}.probe_cache"
+
+# Seconds a probed fan is trusted without connecting to it again
+PROBE_CACHE_TTL = 300
+
+
+class ProbeCache:
+    """Clients with device information read by a recent probe.
+
+    Lets a flow reuse what another flow, such as the user step listing
+    every fan, has just read instead of connecting again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the cache."""
+        self._probes: dict[str, tuple[float, FreshIntelliVent]] = {}
+
+    @callback
+    def async_get(self, address: str) -> FreshIntelliVent | None:
+        """Return the probed client for an address, if still fresh."""
+        if (probe := self._probes.get(address)) is None:
+            return None
+        probed_at, device = probe
+        if time.monotonic() - probed_at > PROBE_CACHE_TTL:
+            del self._probes[address]
+            return None
+        return device
+
+    @callback
+    def async_add(self, device: FreshIntelliVent) -> None:
+        """Remember a client after reading its device information."""
+        self._probes[device.address] = (time.monotonic(), device)
+
+
+@callback
+@singleton(DATA_PROBE_CACHE)
+def async_get_probe_cache(hass: HomeAssistant) -> ProbeCache:
+    """Return the cache shared by all config flows."""
+    return ProbeCache()
@@ -0,0 +1,179 @@
+"""Connection scheduling shared by all Fresh Intellivent Sky fans."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+
+from .const import DOMAIN
+
+DATA_SCHEDULER = f"{DOMAIN}.scheduler"
+
+# Concurrent connections per adapter or proxy
+MAX_CONNECTIONS_PER_SOURCE = 2
+
+# Never hold a background poll back for longer than this (seconds)
+MAX_STAGGER = 60
+
+PRIORITY_WRITE = 0
+PRIORITY_POLL = 1
+
+
+class PrioritySemaphore:
+    """Semaphore where waiters with a lower priority value go first."""
+
+    def __init__(self, value: int) -> None:
+        """Initialize the semaphore."""
+        self._value = value
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+
+    @property
+    def full(self) -> bool:
+        """Return True if acquiring the semaphore now would have to wait."""
+        return self._value == 0 or bool(self._waiters)
+
+    @property
+    def waiting(self) -> bool:
+        """Return True if anyone is waiting for the semaphore."""
+        return any(not future.done() for _, _, future in self._waiters)
+
+    async def acquire(self, priority: int) -> None:
+        """Wait for the semaphore, release it with `release`."""
+        if not self.full:
+            self._value -= 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._counter), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Cancelled right after being handed the slot
+                    self.release()
+                raise
+
+    def release(self) -> None:
+        """Release the semaphore, handing it to the first waiter."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
+
+
+class ConnectionScheduler:
+    """Spread connections from all fans over the available adapters.
+
+    Connections are capped per bluetooth source, with writes let in ahead
+    of background polls. Background polls on the same source are spaced
+    out over the scan interval instead of all starting at once. A kept
+    open connection holds on to its slot until it's closed, and is asked
+    to close while idle as soon as someone else waits for a slot.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the scheduler."""
+        self._semaphores: dict[str, PrioritySemaphore] = {}
+        self._next_poll: dict[str, float] = {}
+        self._registered: set[str] = set()
+        # Callbacks closing idle kept open connections, per source and entry
+        self._idle: dict[str, dict[str, CALLBACK_TYPE]] = {}
+
+    @callback
+    def async_register(self, entry_id: str) -> CALLBACK_TYPE:
+        """Register a fan, return a callback to unregister it."""
+        self._registered.add(entry_id)
+
+        @callback
+        def _async_unregister() -> None:
+            self._registered.discard(entry_id)
+
+        return _async_unregister
+
+    @asynccontextmanager
+    async def async_slot(
+        self, source: str, priority: int, interval: float = 0
+    ) -> AsyncIterator[None]:
+        """Wait for a connection slot on a source and hold it."""
+        await self.async_wait_turn(source, priority, interval)
+        await self.async_acquire(source, priority)
+        try:
+            yield
+        finally:
+            self.async_release(source)
+
+    async def async_wait_turn(
+        self, source: str, priority: int, interval: float = 0
+    ) -> None:
+        """Hold a poll back until its turn on a source.
+
+        Polls are staggered by the interval divided by the number of fans.
+        """
+        if priority == PRIORITY_POLL and interval > 0:
+            spacing = min(MAX_STAGGER, interval / max(1, len(self._registered)))
+            await self._async_stagger(source, spacing)
+
+    async def async_acquire(self, source: str, priority: int) -> None:
+        """Wait for a connection slot on a source, release it with `async_release`.
+
+        If none is free, the longest idle connection kept open on the source
+        is closed to make room.
+        """
+        semaphore = self._semaphore(source)
+        if semaphore.full and (idle := self._idle.get(source)):
+            idle.pop(next(iter(idle)))()
+        await semaphore.acquire(priority)
+
+    @callback
+    def async_release(self, source: str) -> None:
+        """Give a connection slot on a source back."""
+        self._semaphore(source).release()
+
+    @callback
+    def async_set_idle(
+        self, source: str, entry_id: str, close: CALLBACK_TYPE | None
+    ) -> None:
+        """Note that a fan keeps its connection open without using it.
+
+        `close` is called once someone waits for a slot on the source, pass
+        None when the connection is in use again or closed.
+        """
+        idle = self._idle.setdefault(source, {})
+        idle.pop(entry_id, None)
+        if close is None:
+            return
+        if self._semaphore(source).waiting:
+            close()
+            return
+        idle[entry_id] = close
+
+    def _semaphore(self, source: str) -> PrioritySemaphore:
+        semaphore = self._semaphores.get(source)
+        if semaphore is None:
+            semaphore = self._semaphores[source] = PrioritySemaphore(
+                MAX_CONNECTIONS_PER_SOURCE
+            )
+        return semaphore
+
+    async def _async_stagger(self, source: str, spacing: float) -> None:
+        """Reserve the next free start time on a source and wait for it."""
+        now = time.monotonic()
+        start = max(now, self._next_poll.get(source, now))
+        self._next_poll[source] = start + spacing
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+@callback
+@singleton(DATA_SCHEDULER)
+def async_get_scheduler(hass: HomeAssistant) -> ConnectionScheduler:
+    """Return the scheduler shared by all config entries."""
+    return ConnectionScheduler()
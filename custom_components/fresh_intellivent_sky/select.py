@@ -9,13 +9,10 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import CONNECTION_BLUETOOTH
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
 from pyfreshintellivent import FreshIntelliVent
 from pyfreshintellivent.helpers import DETECTION_HIGH, DETECTION_LOW, DETECTION_MEDIUM
 
+from .changes import MODES_KEY, value_key
 from .const import (
     DETECTION_OFF,
     DOMAIN,
@@ -24,6 +21,10 @@ from .const import (
     DETECTION_KEY,
     ENABLED_KEY,
 )
+from .coordinator import FreshIntelliventSkyCoordinator
+from .device_info import CachedDevice
+from .entity import FreshIntelliventSkyEntity
+from .state import state_accessor
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,7 +35,7 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up sensors dynamically through discovery."""
-    coordinator: DataUpdateCoordinator[FreshIntelliVent] = hass.data[DOMAIN][
+    coordinator: FreshIntelliventSkyCoordinator = hass.data[DOMAIN][
         config_entry.entry_id
     ]
 
@@ -42,7 +43,7 @@ async def async_setup_entry(
         [
             FreshIntelliventSkySelect(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 SelectEntityDescription(
                     key="humidity_detection",
                     name="Humidity detection",
@@ -51,7 +52,7 @@ async def async_setup_entry(
             ),
             FreshIntelliventSkySelect(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 SelectEntityDescription(
                     key="light_detection",
                     name="Light detection",
@@ -60,7 +61,7 @@ async def async_setup_entry(
             ),
             FreshIntelliventSkySelect(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 SelectEntityDescription(
                     key="voc_detection",
                     name="VOC detection",
@@ -71,31 +72,31 @@ async def async_setup_entry(
     )
 
 
-class FreshIntelliventSkySelect(
-    CoordinatorEntity[DataUpdateCoordinator[FreshIntelliVent]], SelectEntity
-):
+class FreshIntelliventSkySelect(FreshIntelliventSkyEntity, SelectEntity):
     """Fresh Intellivent Sky numbers for the device."""
 
     _attr_has_entity_name = True
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
-        device: FreshIntelliVent,
+        coordinator: FreshIntelliventSkyCoordinator,
+        device: FreshIntelliVent | CachedDevice,
         entity_description: SelectEntityDescription,
         keys: list | None = None,
     ) -> None:
         """Populate the entity with relevant data."""
-        super().__init__(coordinator)
+        # Listen to the whole mode, as the option depends on `enabled` too
+        super().__init__(
+            coordinator, context=value_key(MODES_KEY, *keys[:-1]) if keys else None
+        )
         self.entity_description = entity_description
 
-        self.device = device
-
         name = f"{device.manufacturer} {device.name}"
 
         self._attr_unique_id = f"{device.manufacturer}_{name}_{entity_description.key}"
         self._attr_entity_category = EntityCategory.CONFIG
-        self._keys = keys
+        # The detection and enabled settings both live on the mode
+        self._mode = state_accessor(keys[:-1]) if keys else None
         self._id = device.address
         self._attr_device_info = DeviceInfo(
             connections={
@@ -121,68 +122,35 @@ class FreshIntelliventSkySelect(
     @property
     def current_option(self) -> str | None:
         """Return the value reported value."""
-        if self._keys is None:
+        if self._mode is None:
+            return None
+        mode = self._mode(self.coordinator.state)
+        if mode.enabled is None:
             return None
-        value = self.coordinator.data.modes
-        for key in self._keys:
-            if value.get(key) is None:
-                return None
-            if key == DETECTION_KEY and value[ENABLED_KEY] == DETECTION_OFF:
-                # pyfreshintellivent doesn't support 'off'.
-                # Need to check the enabled key as well to see if the mode is 'off'.
-                return DETECTION_OFF
-            value = value[key]
-
-        return value
-
-    def _detection_off_check(self, new_value: str, previous_value: str) -> str:
-        """Detection `off` is not supported. Use `enabled=false` instead.
-        # We can reuse the last option to fix this."""
-        if new_value != DETECTION_OFF:
-            return new_value
-        return previous_value
+        if not mode.enabled:
+            # pyfreshintellivent doesn't support 'off'.
+            # A mode that isn't enabled is shown as 'off'.
+            return DETECTION_OFF
+        return mode.detection
 
     async def async_select_option(self, option: str) -> None:
         """Set the option."""
         key = self.entity_description.key
         enabled = option != DETECTION_OFF
 
+        # Detection `off` is not supported. Use `enabled=false` instead and
+        # leave the last detection as it is.
         if key == "humidity_detection":
-            humidity = self.device.modes["humidity"]
-            detection = self._detection_off_check(
-                new_value=option, previous_value=humidity[DETECTION_KEY]
-            )
-
-            self.coordinator.hass.data[HUMIDITY_MODE_UPDATE] = {
-                "enabled": enabled,
-                "detection": detection,
-                "rpm": humidity["rpm"],
-            }
+            values = {ENABLED_KEY: enabled}
+            if enabled:
+                values[DETECTION_KEY] = option
+
+            await self.coordinator.writes.async_queue(HUMIDITY_MODE_UPDATE, values)
         else:
-            light = self.device.modes["light_and_voc"]["light"]
-            light_enabled = light[ENABLED_KEY]
-            light_detection = light[DETECTION_KEY]
-
-            voc = self.device.modes["light_and_voc"]["voc"]
-            voc_enabled = voc[ENABLED_KEY]
-            voc_detection = voc[DETECTION_KEY]
-
-            if key == "light_detection":
-                light_enabled = enabled
-                light_detection = self._detection_off_check(
-                    new_value=option, previous_value=light_detection
-                )
-            else:
-                voc_enabled = enabled
-                voc_detection = self._detection_off_check(
-                    new_value=option, previous_value=voc_detection
-                )
+            prefix = "light_" if key == "light_detection" else "voc_"
 
-            self.coordinator.hass.data[LIGHT_AND_VOC_MODE_UPDATE] = {
-                "light_enabled": light_enabled,
-                "light_detection": light_detection,
-                "voc_enabled": voc_enabled,
-                "voc_detection": voc_detection,
-            }
+            values = {prefix + ENABLED_KEY: enabled}
+            if enabled:
+                values[prefix + DETECTION_KEY] = option
 
-        await self.coordinator.async_request_refresh()
+            await self.coordinator.writes.async_queue(LIGHT_AND_VOC_MODE_UPDATE, values)
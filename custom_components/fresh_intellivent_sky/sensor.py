@@ -2,6 +2,9 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from operator import attrgetter
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -10,30 +13,106 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE, REVOLUTIONS_PER_MINUTE, UnitOfTemperature
+from homeassistant.const import (
+    PERCENTAGE,
+    REVOLUTIONS_PER_MINUTE,
+    UnitOfTemperature,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import CONNECTION_BLUETOOTH
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
 from pyfreshintellivent import FreshIntelliVent
 
+from .backoff import CIRCUIT_STATES
+from .changes import DIAGNOSTICS_KEY, SENSORS_KEY, value_key
 from .const import DOMAIN
+from .coordinator import FreshIntelliventSkyCoordinator
+from .device_info import CachedDevice
+from .entity import FreshIntelliventSkyEntity
+from .timing import PHASE_CONNECT
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class FreshIntelliventSkyDiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor with a value from the coordinator."""
+
+    value_fn: Callable[[FreshIntelliventSkyCoordinator], StateType]
+
+
+DIAGNOSTIC_SENSORS = [
+    FreshIntelliventSkyDiagnosticSensorEntityDescription(
+        device_class=SensorDeviceClass.DURATION,
+        entity_registry_enabled_default=False,
+        key="scan_interval",
+        name="Scan interval",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        value_fn=lambda coordinator: coordinator.update_interval.total_seconds(),
+    ),
+    FreshIntelliventSkyDiagnosticSensorEntityDescription(
+        device_class=SensorDeviceClass.DURATION,
+        entity_registry_enabled_default=False,
+        key="last_cycle_duration",
+        name="Last cycle duration",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        value_fn=lambda coordinator: (
+            coordinator.last_cycle.duration if coordinator.last_cycle else None
+        ),
+    ),
+    FreshIntelliventSkyDiagnosticSensorEntityDescription(
+        device_class=SensorDeviceClass.DURATION,
+        entity_registry_enabled_default=False,
+        key="connect_time",
+        name="Connect time",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        value_fn=lambda coordinator: (
+            coordinator.last_cycle.phases.get(PHASE_CONNECT)
+            if coordinator.last_cycle
+            else None
+        ),
+    ),
+    FreshIntelliventSkyDiagnosticSensorEntityDescription(
+        entity_registry_enabled_default=False,
+        key="gatt_operations",
+        name="GATT operations",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: (
+            coordinator.last_cycle.gatt_ops if coordinator.last_cycle else None
+        ),
+    ),
+    FreshIntelliventSkyDiagnosticSensorEntityDescription(
+        entity_registry_enabled_default=False,
+        key="consecutive_failures",
+        name="Consecutive failures",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.backoff.failures,
+    ),
+    FreshIntelliventSkyDiagnosticSensorEntityDescription(
+        device_class=SensorDeviceClass.ENUM,
+        entity_registry_enabled_default=False,
+        key="circuit_breaker",
+        name="Circuit breaker",
+        options=CIRCUIT_STATES,
+        value_fn=lambda coordinator: coordinator.backoff.circuit,
+    ),
+]
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up sensors dynamically through discovery."""
-    coordinator: DataUpdateCoordinator[FreshIntelliVent] = hass.data[DOMAIN][
+    coordinator: FreshIntelliventSkyCoordinator = hass.data[DOMAIN][
         config_entry.entry_id
     ]
 
@@ -41,7 +120,7 @@ async def async_setup_entry(
         [
             FreshIntelliventSkySensor(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 SensorEntityDescription(
                     device_class=SensorDeviceClass.TEMPERATURE,
                     key="temperature",
@@ -52,7 +131,7 @@ async def async_setup_entry(
             ),
             FreshIntelliventSkySensor(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 SensorEntityDescription(
                     device_class=SensorDeviceClass.HUMIDITY,
                     key="humidity",
@@ -63,7 +142,7 @@ async def async_setup_entry(
             ),
             FreshIntelliventSkySensor(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 SensorEntityDescription(
                     key="rpm",
                     name="Current speed",
@@ -73,7 +152,7 @@ async def async_setup_entry(
             ),
             FreshIntelliventSkySensor(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 SensorEntityDescription(
                     key="mode",
                     name="Mode",
@@ -81,7 +160,7 @@ async def async_setup_entry(
             ),
             FreshIntelliventSkySensor(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 SensorEntityDescription(
                     key="mode_raw",
                     name="Mode raw",
@@ -90,33 +169,42 @@ async def async_setup_entry(
                 EntityCategory.DIAGNOSTIC,
             ),
         ]
+        + [
+            FreshIntelliventSkyDiagnosticSensor(
+                coordinator,
+                coordinator.device,
+                entity_description,
+                EntityCategory.DIAGNOSTIC,
+            )
+            for entity_description in DIAGNOSTIC_SENSORS
+        ]
     )
 
 
-class FreshIntelliventSkySensor(
-    CoordinatorEntity[DataUpdateCoordinator[FreshIntelliVent]], SensorEntity
-):
+class FreshIntelliventSkySensor(FreshIntelliventSkyEntity, SensorEntity):
     """Fresh Intellivent sensors for the device."""
 
     _attr_has_entity_name = True
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
-        device: FreshIntelliVent,
+        coordinator: FreshIntelliventSkyCoordinator,
+        device: FreshIntelliVent | CachedDevice,
         entity_description: SensorEntityDescription,
         entity_category: EntityCategory | None = None,
         keys: list | None = None,
     ) -> None:
         """Populate the entity with relevant data."""
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator, context=value_key(SENSORS_KEY, entity_description.key)
+        )
         self.entity_description = entity_description
 
         name = f"{device.manufacturer} {device.name}"
 
         self._attr_unique_id = f"{device.manufacturer}_{name}_{entity_description.key}"
         self._attr_entity_category = entity_category
-        self._keys = keys
+        self._value = attrgetter(entity_description.key)
         self._id = device.address
         self._attr_device_info = DeviceInfo(
             connections={
@@ -135,4 +223,39 @@ class FreshIntelliventSkySensor(
     @property
     def native_value(self) -> StateType:
         """Return the value reported by the sensor."""
-        return self.coordinator.data.sensors.as_dict()[self.entity_description.key]
+        if (sensors := self.coordinator.sensors) is None:
+            return None
+        return self._value(sensors)
+
+
+class FreshIntelliventSkyDiagnosticSensor(FreshIntelliventSkySensor):
+    """Fresh Intellivent diagnostic sensors for the integration itself."""
+
+    entity_description: FreshIntelliventSkyDiagnosticSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: FreshIntelliventSkyCoordinator,
+        device: FreshIntelliVent | CachedDevice,
+        entity_description: FreshIntelliventSkyDiagnosticSensorEntityDescription,
+        entity_category: EntityCategory | None = None,
+    ) -> None:
+        """Populate the entity with relevant data."""
+        super().__init__(coordinator, device, entity_description, entity_category)
+        # The value comes from the coordinator, not from the fan
+        self.coordinator_context = DIAGNOSTICS_KEY
+
+    @property
+    def available(self) -> bool:
+        """Stay available when updates fail, that's when these matter."""
+        return True
+
+    @property
+    def extra_state_attributes(self) -> None:
+        """Values from the coordinator itself are never restored."""
+        return None
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the value from the coordinator."""
+        return self.entity_description.value_fn(self.coordinator)
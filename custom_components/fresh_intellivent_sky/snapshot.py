@@ -0,0 +1,54 @@
+"""Immutable sensor values for Fresh Intellivent Sky."""
+from __future__ import annotations
+
+from dataclasses import dataclass, fields, replace
+from typing import Any
+
+from pyfreshintellivent.sensors import SkySensors
+
+
+@dataclass(frozen=True, slots=True)
+class SensorSnapshot:
+    """Sensor values as of one update, shared by every entity of a fan."""
+
+    status: bool | None = None
+    mode: str | None = None
+    mode_raw: int | None = None
+    humidity: float | None = None
+    temperature: float | None = None
+    temperature_avg: float | None = None
+    rpm: int | None = None
+    authenticated: bool | None = None
+    unknowns: tuple[int, ...] | None = None
+
+    @classmethod
+    def from_sensors(cls, sensors: SkySensors) -> SensorSnapshot:
+        """Take the current values of the client's sensors."""
+        return cls(
+            status=sensors.status,
+            mode=sensors.mode,
+            mode_raw=sensors.mode_raw,
+            humidity=sensors.humidity,
+            temperature=sensors.temperature,
+            temperature_avg=sensors.temperature_avg,
+            rpm=sensors.rpm,
+            authenticated=sensors.authenticated,
+            unknowns=None if sensors.unknowns is None else tuple(sensors.unknowns),
+        )
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Any]) -> SensorSnapshot:
+        """Take values saved with `as_dict`, ignoring unknown ones."""
+        snapshot = cls(
+            **{name: values[name] for name in SENSOR_FIELDS if name in values}
+        )
+        if snapshot.unknowns is None:
+            return snapshot
+        return replace(snapshot, unknowns=tuple(snapshot.unknowns))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the values keyed by field name."""
+        return {name: getattr(self, name) for name in SENSOR_FIELDS}
+
+
+SENSOR_FIELDS = tuple(field.name for field in fields(SensorSnapshot))
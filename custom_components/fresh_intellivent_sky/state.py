@@ -0,0 +1,126 @@
+"""Typed mode settings for Fresh Intellivent Sky."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field, is_dataclass
+from operator import attrgetter
+from typing import Any
+
+
+@dataclass(slots=True)
+class AiringState:
+    """Airing mode settings."""
+
+    enabled: bool | None = None
+    minutes: int | None = None
+    rpm: int | None = None
+
+
+@dataclass(slots=True)
+class BoostState:
+    """Boost settings."""
+
+    enabled: bool | None = None
+    seconds: int | None = None
+    rpm: int | None = None
+
+
+@dataclass(slots=True)
+class ConstantSpeedState:
+    """Constant speed mode settings."""
+
+    enabled: bool | None = None
+    rpm: int | None = None
+
+
+@dataclass(slots=True)
+class HumidityState:
+    """Humidity mode settings."""
+
+    enabled: bool | None = None
+    detection: str | None = None
+    detection_raw: int | None = None
+    rpm: int | None = None
+
+
+@dataclass(slots=True)
+class DetectionState:
+    """Light or VOC detection settings."""
+
+    enabled: bool | None = None
+    detection: str | None = None
+    detection_raw: int | None = None
+
+
+@dataclass(slots=True)
+class LightAndVocState:
+    """Light and VOC mode settings."""
+
+    light: DetectionState = field(default_factory=DetectionState)
+    voc: DetectionState = field(default_factory=DetectionState)
+
+
+@dataclass(slots=True)
+class PauseState:
+    """Pause settings."""
+
+    enabled: bool | None = None
+    minutes: int | None = None
+
+
+@dataclass(slots=True)
+class DelayState:
+    """Timer delay settings."""
+
+    enabled: bool | None = None
+    minutes: int | None = None
+
+
+@dataclass(slots=True)
+class TimerState:
+    """Timer mode settings."""
+
+    minutes: int | None = None
+    delay: DelayState = field(default_factory=DelayState)
+    rpm: int | None = None
+
+
+@dataclass(slots=True)
+class DeviceState:
+    """Mode settings of one fan, updated in place by the coordinator."""
+
+    airing: AiringState = field(default_factory=AiringState)
+    boost: BoostState = field(default_factory=BoostState)
+    constant_speed: ConstantSpeedState = field(default_factory=ConstantSpeedState)
+    humidity: HumidityState = field(default_factory=HumidityState)
+    light_and_voc: LightAndVocState = field(default_factory=LightAndVocState)
+    pause: PauseState = field(default_factory=PauseState)
+    timer: TimerState = field(default_factory=TimerState)
+
+    def update(self, modes: dict[str, Any]) -> None:
+        """Copy the modes read from or written to the client."""
+        _update(self, modes)
+
+    def mode_values(self, mode: str) -> dict[str, Any]:
+        """Return the settings of a mode as a nested dict."""
+        return asdict(getattr(self, mode))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the settings of all modes as a nested dict."""
+        return asdict(self)
+
+
+def _update(target: Any, values: dict[str, Any]) -> None:
+    for key, value in values.items():
+        if not hasattr(target, key):
+            continue
+        current = getattr(target, key)
+        if is_dataclass(current) and isinstance(value, dict):
+            _update(current, value)
+        else:
+            setattr(target, key, value)
+
+
+def state_accessor(keys: list[str]) -> Callable[[DeviceState], Any]:
+    """Return a function reading the setting at a path, such as `timer.delay`."""
+    return attrgetter(".".join(keys))
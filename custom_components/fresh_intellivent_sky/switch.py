@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import logging
-from typing import cast
 
 from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
 from homeassistant.config_entries import ConfigEntry
@@ -10,13 +9,14 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import CONNECTION_BLUETOOTH
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
 from pyfreshintellivent import FreshIntelliVent
 
-from .const import CONSTANT_SPEED_UPDATE, DOMAIN, ENABLED_KEY, RPM_KEY
+from .changes import MODES_KEY, value_key
+from .const import CONSTANT_SPEED_UPDATE, DOMAIN, ENABLED_KEY
+from .coordinator import FreshIntelliventSkyCoordinator
+from .device_info import CachedDevice
+from .entity import FreshIntelliventSkyEntity
+from .state import state_accessor
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,7 +27,7 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up sensors dynamically through discovery."""
-    coordinator: DataUpdateCoordinator[FreshIntelliVent] = hass.data[DOMAIN][
+    coordinator: FreshIntelliventSkyCoordinator = hass.data[DOMAIN][
         config_entry.entry_id
     ]
 
@@ -35,7 +35,7 @@ async def async_setup_entry(
         [
             FreshIntelliventSkySwitch(
                 coordinator,
-                coordinator.data,
+                coordinator.device,
                 SwitchEntityDescription(
                     key="constant_speed_enabled",
                     name="Constant speed",
@@ -47,31 +47,30 @@ async def async_setup_entry(
     )
 
 
-class FreshIntelliventSkySwitch(
-    CoordinatorEntity[DataUpdateCoordinator[FreshIntelliVent]], SwitchEntity
-):
+class FreshIntelliventSkySwitch(FreshIntelliventSkyEntity, SwitchEntity):
     """Fresh Intellivent Sky numbers for the device."""
 
     _attr_has_entity_name = True
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
-        device: FreshIntelliVent,
+        coordinator: FreshIntelliventSkyCoordinator,
+        device: FreshIntelliVent | CachedDevice,
         entity_description: SwitchEntityDescription,
         entity_category: EntityCategory | None = None,
         keys: list | None = None,
     ) -> None:
         """Populate the entity with relevant data."""
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator, context=value_key(MODES_KEY, *keys) if keys else None
+        )
         self.entity_description = entity_description
 
         name = f"{device.manufacturer} {device.name}"
 
-        self.device = device
         self._attr_unique_id = f"{device.manufacturer}_{name}_{entity_description.key}"
         self._attr_entity_category = entity_category
-        self._keys = keys
+        self._value = state_accessor(keys) if keys else None
         self._id = device.address
         self._attr_device_info = DeviceInfo(
             connections={
@@ -89,15 +88,9 @@ class FreshIntelliventSkySwitch(
     @property
     def is_on(self) -> bool:
         """Return the value reported by the sensor."""
-        if self._keys is None:
+        if self._value is None:
             return None
-        value = self.coordinator.data.modes
-        for key in self._keys:
-            if value.get(key) is None:
-                return None
-            value = value[key]
-
-        return cast(bool, value)
+        return self._value(self.coordinator.state)
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on."""
@@ -112,9 +105,6 @@ class FreshIntelliventSkySwitch(
         key = self.entity_description.key
 
         if key == "constant_speed_enabled":
-            self.coordinator.hass.data[CONSTANT_SPEED_UPDATE] = {
-                ENABLED_KEY: new_value,
-                RPM_KEY: self.device.modes["constant_speed"][RPM_KEY],
-            }
-
-        await self.coordinator.async_request_refresh()
+            await self.coordinator.writes.async_queue(
+                CONSTANT_SPEED_UPDATE, {ENABLED_KEY: new_value}
+            )
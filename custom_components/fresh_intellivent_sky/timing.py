@@ -0,0 +1,88 @@
+"""Timing of poll and write cycles for Fresh Intellivent Sky."""
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, ContextManager
+
+from homeassistant.util import dt as dt_util
+
+# Cycles kept for diagnostics
+CYCLE_HISTORY_SIZE = 50
+
+CYCLE_POLL = "poll"
+CYCLE_WRITE = "write"
+
+# Waiting for the scheduler to hand out a connection slot
+PHASE_WAIT = "wait"
+PHASE_CONNECT = "connect"
+PHASE_AUTHENTICATE = "authenticate"
+PHASE_SENSORS = "sensors"
+PHASE_DEVICE_INFORMATION = "device_information"
+# Mode reads and writes are timed per mode, see `read_phase` and `write_phase`
+
+
+@dataclass(slots=True)
+class CycleTiming:
+    """How long one poll or write cycle took, phase by phase."""
+
+    kind: str
+    started: float = field(default_factory=time.monotonic)
+    started_at: float = field(default_factory=time.time)
+    duration: float | None = None
+    phases: dict[str, float] = field(default_factory=dict)
+    gatt_ops: int = 0
+    gatt_bytes: int = 0
+    # Adapter or proxy the fan was last heard through, and how well
+    source: str | None = None
+    rssi: int | None = None
+    error: str | None = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Add time spent in a phase."""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """Time the duration of the context as a phase."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(phase, time.monotonic() - started)
+
+    def finish(self, error: Exception | None = None) -> None:
+        """Note that the cycle is done."""
+        self.duration = time.monotonic() - self.started
+        self.error = None if error is None else str(error)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the cycle for diagnostics."""
+        return {
+            "kind": self.kind,
+            "started_at": dt_util.utc_from_timestamp(self.started_at).isoformat(),
+            "duration": self.duration,
+            "phases": self.phases,
+            "gatt_ops": self.gatt_ops,
+            "gatt_bytes": self.gatt_bytes,
+            "source": self.source,
+            "rssi": self.rssi,
+            "error": self.error,
+        }
+
+
+def timed(timing: CycleTiming | None, phase: str) -> ContextManager[None]:
+    """Time a phase if there is a cycle to add it to."""
+    return nullcontext() if timing is None else timing.phase(phase)
+
+
+def read_phase(mode: str) -> str:
+    """Return the phase of reading a mode, such as `read_airing`."""
+    return f"read_{mode}"
+
+
+def write_phase(mode: str) -> str:
+    """Return the phase of writing a mode, such as `write_airing`."""
+    return f"write_{mode}"
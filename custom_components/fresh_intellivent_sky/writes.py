@@ -0,0 +1,222 @@
+"""Coalescing of entity writes for Fresh Intellivent Sky."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, TypedDict, Union
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def merge_values(pending: dict[str, Any], values: dict[str, Any]) -> dict[str, Any]:
+    """Merge new values into pending ones, the last write wins per field."""
+    merged = dict(pending)
+    for key, value in values.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_values(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class DelayValues(TypedDict, total=False):
+    """Timer delay values."""
+
+    enabled: bool
+    minutes: int
+
+
+class AiringValues(TypedDict, total=False):
+    """Values written with `update_airing`."""
+
+    enabled: bool
+    minutes: int
+    rpm: int
+
+
+class BoostValues(TypedDict, total=False):
+    """Values written with `update_boost`."""
+
+    enabled: bool
+    minutes: int
+    rpm: int
+
+
+class ConstantSpeedValues(TypedDict, total=False):
+    """Values written with `update_constant_speed`."""
+
+    enabled: bool
+    rpm: int
+
+
+class HumidityValues(TypedDict, total=False):
+    """Values written with `update_humidity`."""
+
+    enabled: bool
+    detection: str
+    rpm: int
+
+
+class LightAndVocValues(TypedDict, total=False):
+    """Values written with `update_light_and_voc`."""
+
+    light_enabled: bool
+    light_detection: str
+    voc_enabled: bool
+    voc_detection: str
+
+
+class PauseValues(TypedDict, total=False):
+    """Values written with `update_pause`."""
+
+    enabled: bool
+    minutes: int
+
+
+class TimerValues(TypedDict, total=False):
+    """Values written with `update_timer`."""
+
+    minutes: int
+    delay: DelayValues
+    rpm: int
+
+
+PendingValues = Union[
+    AiringValues,
+    BoostValues,
+    ConstantSpeedValues,
+    HumidityValues,
+    LightAndVocValues,
+    PauseValues,
+    TimerValues,
+]
+
+
+class PendingWrites:
+    """Values waiting to be written to one device.
+
+    Keyed by the `*_UPDATE` constants, with only the changed fields of each
+    mode. Every config entry has its own store, so fans never see each
+    other's writes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self._values: dict[str, PendingValues] = {}
+
+    def __len__(self) -> int:
+        """Return the number of modes with pending values."""
+        return len(self._values)
+
+    def get(self, key: str) -> PendingValues | None:
+        """Return the pending values for a mode."""
+        return self._values.get(key)
+
+    def merge(self, key: str, values: PendingValues) -> bool:
+        """Add values for a mode, return True if merged with pending ones."""
+        pending = self._values.get(key)
+        if pending is None:
+            self._values[key] = values
+            return False
+
+        self._values[key] = merge_values(pending, values)
+        return True
+
+    @contextmanager
+    def take(self, key: str) -> Iterator[PendingValues | None]:
+        """Remove the pending values for a mode while they are written.
+
+        If writing fails they are put back, below anything queued meanwhile.
+        """
+        values = self._values.pop(key, None)
+        try:
+            yield values
+        except BaseException:
+            if values is not None:
+                self._values[key] = merge_values(values, self._values.get(key, {}))
+            raise
+
+
+class WriteCoalescer:
+    """Collect entity writes during a short window and flush them together.
+
+    Writes to the same mode are merged into one pending update, so moving a
+    slider or changing a few settings in a row ends up in one BLE session.
+    Writes queued while a flush is running start a new window, and their
+    flush waits for the running one to finish.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        pending: PendingWrites,
+        delay: float,
+        flush: Callable[[], Awaitable[None]],
+    ) -> None:
+        """Initialize the coalescer."""
+        self._hass = hass
+        self._pending = pending
+        self._delay = delay
+        self._flush = flush
+        self._flush_lock = asyncio.Lock()
+        self._cancel_timer: CALLBACK_TYPE | None = None
+
+        self.queued = 0
+        self.merged = 0
+        self.flushes = 0
+        self._queued_since_flush = 0
+        self._merged_since_flush = 0
+
+    async def async_queue(self, key: str, values: PendingValues) -> None:
+        """Queue changed values for a mode and schedule a flush."""
+        self.queued += 1
+        self._queued_since_flush += 1
+        if self._pending.merge(key, values):
+            self.merged += 1
+            self._merged_since_flush += 1
+
+        if self._cancel_timer is None:
+            self._cancel_timer = async_call_later(
+                self._hass, self._delay, self._async_timer_flush
+            )
+
+    async def async_flush(self) -> None:
+        """Write anything pending now instead of at the end of the window."""
+        self._async_cancel_timer()
+        await self._async_flush()
+
+    async def _async_timer_flush(self, _now: datetime) -> None:
+        self._cancel_timer = None
+        await self._async_flush()
+
+    async def _async_flush(self) -> None:
+        async with self._flush_lock:
+            if not len(self._pending):
+                # Written by a flush that was running when this one started
+                return
+            _LOGGER.debug(
+                "Flushing %s writes, %s of them merged",
+                self._queued_since_flush,
+                self._merged_since_flush,
+            )
+            self.flushes += 1
+            self._queued_since_flush = 0
+            self._merged_since_flush = 0
+            await self._flush()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel any scheduled flush."""
+        self._async_cancel_timer()
+
+    @callback
+    def _async_cancel_timer(self) -> None:
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None